@@ -1,16 +1,33 @@
 from django.contrib import admin
+from django.db.models.expressions import RawSQL
 
+from . import search
 from .models import Comment, Follow, Group, Post
 
 
-class PostAdmin(admin.ModelAdmin):
+class FullTextSearchMixin:
+    """Answer the admin search box from the FTS5 index."""
+
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        expression = search.match_expression(search_term)
+        if not expression or not search.available():
+            return super().get_search_results(request, queryset, search_term)
+        ids = RawSQL(search.ids_sql(self.search_kind), [expression])
+        return queryset.filter(pk__in=ids), False
+
+
+class PostAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = search.POST
     list_display = ('pk', 'text', 'pub_date', 'author')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = search.COMMENT
     list_display = ('pk', 'text', 'post', 'author', 'created')
     search_fields = ('text',)
     list_filter = ('created',)
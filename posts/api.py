@@ -0,0 +1,204 @@
+"""Read-only JSON API.
+
+Rows are read with ``.values()`` and serialized as they come, no model
+instance is built. Lists are keyset paginated with ``CursorPaginator``
+(``?after=`` and ``?limit=``) and ``?fields=`` picks the keys returned.
+Every response carries an ETag built from generation stamps.
+"""
+import functools
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import etag, require_safe
+
+from .etags import api_etag, api_follows_etag
+from .models import Comment, Follow, Group, Post
+from .pagination import CursorPaginator
+
+# Public name -> lookup passed to ``.values()``.
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'comments_count': 'comments_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+GROUP_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'description': 'description',
+}
+FOLLOW_FIELDS = {
+    'id': 'id',
+    'user': 'user__username',
+    'author': 'author__username',
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _error(message, status):
+    return JsonResponse({'detail': message}, status=status)
+
+
+def api_view(view):
+    """GET/HEAD only, errors are answered in JSON too."""
+    @functools.wraps(view)
+    @require_safe
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except BadRequest as error:
+            return _error(str(error), 400)
+        except Http404:
+            return _error('Not found', 404)
+    return wrapper
+
+
+def _fields(request, available):
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(available)
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise BadRequest(f'Unknown fields: {", ".join(unknown)}')
+    return names
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest('limit must be a number')
+    return min(max(limit, 1), settings.API_MAX_PAGE_SIZE)
+
+
+def _image_url(name):
+    if not name:
+        return None
+    return Post._meta.get_field('image').storage.url(name)
+
+
+def _rows(queryset, available, names, extra=()):
+    """``.values()`` rows renamed to public names.
+
+    ``extra`` lookups are selected for pagination but left out unless
+    asked for.
+    """
+    lookups = list(dict.fromkeys(
+        [available[name] for name in names] + list(extra)
+    ))
+    return queryset.values(*lookups), lambda row: {
+        name: (_image_url(row[available[name]]) if name == 'image'
+               else row[available[name]])
+        for name in names
+    }
+
+
+def _page(request, queryset, available, field):
+    names = _fields(request, available)
+    rows, serialize = _rows(queryset, available, names, ('id', field))
+    paginator = CursorPaginator(rows, _limit(request), field)
+    page = paginator.page_after(request.GET.get('after'))
+    return JsonResponse({
+        'results': [serialize(row) for row in page.object_list],
+        'next': page.next_cursor,
+    })
+
+
+def _detail(request, queryset, available):
+    names = _fields(request, available)
+    rows, serialize = _rows(queryset, available, names)
+    return JsonResponse(serialize(get_object_or_404(rows)))
+
+
+@api_view
+@etag(api_etag)
+def posts(request):
+    """Newest posts, optionally of one ``?author=`` or ``?group=``."""
+    queryset = Post.objects.all()
+    if request.GET.get('author'):
+        queryset = queryset.filter(author__username=request.GET['author'])
+    if request.GET.get('group'):
+        queryset = queryset.filter(group__slug=request.GET['group'])
+    return _page(request, queryset, POST_FIELDS, 'pub_date')
+
+
+@api_view
+@etag(api_etag)
+def post(request, post_id):
+    return _detail(request, Post.objects.filter(id=post_id), POST_FIELDS)
+
+
+@api_view
+@etag(api_etag)
+def posts_batch(request):
+    """Posts of ``?ids=1,2,3`` in that order, in a single query."""
+    try:
+        ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk]
+    except ValueError:
+        raise BadRequest('ids must be numbers')
+    if len(ids) > settings.API_MAX_PAGE_SIZE:
+        raise BadRequest(f'At most {settings.API_MAX_PAGE_SIZE} ids')
+    names = _fields(request, POST_FIELDS)
+    rows, serialize = _rows(Post.objects.filter(id__in=ids), POST_FIELDS,
+                            names, ('id',))
+    found = {row['id']: serialize(row) for row in rows}
+    return JsonResponse({
+        'results': [found[pk] for pk in dict.fromkeys(ids) if pk in found],
+        'missing': [pk for pk in dict.fromkeys(ids) if pk not in found],
+    })
+
+
+@api_view
+@etag(api_etag)
+def post_comments(request, post_id):
+    get_object_or_404(Post.objects.values('id'), id=post_id)
+    return _page(request, Comment.objects.filter(post_id=post_id),
+                 COMMENT_FIELDS, 'created')
+
+
+@api_view
+@etag(api_etag)
+def groups(request):
+    return _page(request, Group.objects.all(), GROUP_FIELDS, 'id')
+
+
+@api_view
+@etag(api_etag)
+def group(request, slug):
+    return _detail(request, Group.objects.filter(slug=slug), GROUP_FIELDS)
+
+
+@api_view
+@etag(api_follows_etag)
+def follows(request):
+    """Follows of one ``?user=`` (who they follow) or ``?author=``.
+
+    Pages are ordered by the id of the other side, which the unique
+    ``(user, author)`` and the ``(author, user)`` indexes already hold.
+    """
+    queryset = Follow.objects.all()
+    if request.GET.get('user'):
+        queryset = queryset.filter(user__username=request.GET['user'])
+        field = 'author_id'
+    elif request.GET.get('author'):
+        queryset = queryset.filter(author__username=request.GET['author'])
+        field = 'user_id'
+    else:
+        raise BadRequest('Pass user or author')
+    return _page(request, queryset, FOLLOW_FIELDS, field)
@@ -0,0 +1,14 @@
+from django.urls import path
+
+from . import api
+
+urlpatterns = [
+    path('posts/', api.posts, name='api_posts'),
+    path('posts/batch/', api.posts_batch, name='api_posts_batch'),
+    path('posts/<int:post_id>/', api.post, name='api_post'),
+    path('posts/<int:post_id>/comments/', api.post_comments,
+         name='api_post_comments'),
+    path('groups/', api.groups, name='api_groups'),
+    path('groups/<slug:slug>/', api.group, name='api_group'),
+    path('follows/', api.follows, name='api_follows'),
+]
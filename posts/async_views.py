@@ -0,0 +1,205 @@
+"""Async versions of the hot read views, served by ``yatube/asgi.py``.
+
+They answer like the views of ``posts.views``, but the lookups that don't
+depend on each other run at once, each in a worker thread with its own
+database connection: the row count of a list page and its rows, or the
+author's counters and the follow check of a profile. Templates render in
+the request's thread, the ORM of this Django version is synchronous.
+
+Queries of the worker threads are not counted by
+``QueryBudgetMiddleware``, which only sees the request's thread.
+"""
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.core.paginator import Paginator
+from django.db import close_old_connections
+from django.shortcuts import get_object_or_404, render
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from . import pagination, recommendations
+from .counters import author_stats, total_posts
+from .etags import (follow_etag, group_etag, index_etag, post_etag,
+                    profile_etag)
+from .forms import CommentForm
+from .models import Follow, Group, Post, User
+from .timeline import feed
+from .views import comments_page
+
+
+def _closing(call):
+    @wraps(call)
+    def run():
+        try:
+            return call()
+        finally:
+            close_old_connections()
+    return run
+
+
+async def concurrently(*calls):
+    """Run the blocking ``calls`` at once; return their results in order."""
+    return await asyncio.gather(*(
+        sync_to_async(_closing(call), thread_sensitive=False)()
+        for call in calls
+    ))
+
+
+def etag(etag_func):
+    """``django.views.decorators.http.etag`` for async views."""
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            res_etag = await sync_to_async(etag_func)(request, *args, **kwargs)
+            res_etag = quote_etag(res_etag) if res_etag is not None else None
+            response = get_conditional_response(request, etag=res_etag)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and res_etag:
+                response.headers.setdefault('ETag', res_etag)
+            return response
+        return inner
+    return decorator
+
+
+def login_required(view):
+    """``django.contrib.auth.decorators.login_required`` for async views."""
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        if not await sync_to_async(lambda: request.user.is_authenticated)():
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return inner
+
+
+async def paginate(request, queryset, per_page, field='pub_date', count=None):
+    """``pagination.paginate`` counting the rows while it fetches the page.
+
+    Keyset pages and odd page numbers are left to ``pagination.paginate``.
+    """
+    number = pagination.page_number(request)
+    if number is not None and not (request.GET.get('after')
+                                   or request.GET.get('before')):
+        paginator = Paginator(queryset.order_by(f'-{field}', '-id'),
+                              per_page)
+        bottom = (number - 1) * per_page
+        total, rows = await concurrently(
+            count or (lambda: paginator.count),
+            lambda: list(paginator.object_list[bottom:bottom + per_page + 1]),
+        )
+        if rows or number == 1:
+            page = pagination.counted_page(paginator, number, total, rows)
+        else:
+            [page] = await concurrently(lambda: pagination.counted_page(
+                paginator, number, total, rows
+            ))
+        return paginator, pagination.with_next_cursor(page, field)
+    [result] = await concurrently(
+        lambda: pagination.paginate(request, queryset, per_page, field,
+                                    count=count)
+    )
+    return result
+
+
+async def _render(request, template_name, context):
+    return await sync_to_async(render)(request, template_name, context)
+
+
+@etag(index_etag)
+async def index(request):
+    paginator, page = await paginate(request, Post.objects.for_list(), 10,
+                                     count=total_posts)
+    context = {
+        'page': page,
+        'paginator': paginator
+    }
+    return await _render(request, 'index.html', context)
+
+
+@etag(group_etag)
+async def group_posts(request, slug):
+    [group] = await concurrently(lambda: get_object_or_404(Group, slug=slug))
+    paginator, page = await paginate(request, group.posts.for_list(), 10)
+    context = {
+        'group': group,
+        'page': page,
+        'paginator': paginator
+    }
+    return await _render(request, 'group.html', context)
+
+
+def _follows(request, author):
+    if not request.user.is_authenticated:
+        return None
+    return Follow.objects.filter(user=request.user, author=author).exists()
+
+
+@etag(profile_etag)
+async def profile(request, username):
+    [user] = await concurrently(
+        lambda: get_object_or_404(User, username=username)
+    )
+    (paginator, page), (stats, created, recommended) = await asyncio.gather(
+        paginate(request, user.posts.for_list(), 3),
+        concurrently(lambda: author_stats(user),
+                     lambda: _follows(request, user),
+                     lambda: recommendations.for_user(request.user,
+                                                      exclude=user.pk)),
+    )
+    context = {
+        'username': user,
+        'fullname': user.get_full_name(),
+        'posts_count': stats.posts_count,
+        'page': page,
+        'paginator': paginator,
+        'followers': stats.followers_count,
+        'following': stats.following_count,
+        'created': created,
+        'recommendations': recommended,
+    }
+    return await _render(request, 'profile.html', context)
+
+
+@etag(post_etag)
+async def post_view(request, username, post_id):
+    user, post = await concurrently(
+        lambda: get_object_or_404(User, username=username),
+        lambda: get_object_or_404(
+            Post.objects.select_related('author', 'group'), id=post_id
+        ),
+    )
+    stats, comments = await concurrently(
+        lambda: author_stats(user),
+        lambda: comments_page(request, post),
+    )
+    context = {
+        'username': user,
+        'fullname': user.get_full_name(),
+        'posts_count': stats.posts_count,
+        'post': post,
+        'form': CommentForm(),
+        'items': comments.paginator.object_list,
+        'comments': comments,
+        'followers': stats.followers_count,
+        'following': stats.following_count,
+    }
+    return await _render(request, 'post.html', context)
+
+
+@login_required
+@etag(follow_etag)
+async def follow_index(request):
+    posts, recommended = await concurrently(
+        lambda: feed(request.user).for_list(),
+        lambda: recommendations.for_user(request.user),
+    )
+    paginator, page = await paginate(request, posts, 10)
+    context = {
+        'page': page,
+        'paginator': paginator,
+        'recommendations': recommended,
+    }
+    return await _render(request, 'follow.html', context)
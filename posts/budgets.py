@@ -0,0 +1,27 @@
+"""Query budgets of the views in ``posts/urls.py`` and ``posts/api_urls.py``,
+keyed by URL name.
+
+Budgets cover the whole request, session and user lookups included.
+"""
+QUERY_BUDGETS = {
+    'index': 4,
+    'group': 5,
+    'follow_index': 5,
+    'trending': 4,
+    'search': 6,
+    'profile': 8,
+    'post': 7,
+    'post_comments': 4,
+    'new_post': 14,
+    'post_edit': 11,
+    'add_comment': 10,
+    'profile_follow': 14,
+    'profile_unfollow': 12,
+    'api_posts': 4,
+    'api_post': 3,
+    'api_posts_batch': 3,
+    'api_post_comments': 5,
+    'api_groups': 4,
+    'api_group': 3,
+    'api_follows': 4,
+}
@@ -0,0 +1,128 @@
+"""Helpers for writes that go around ``Model.save()`` and its signals."""
+from contextlib import contextmanager
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Max, Q
+
+from . import counters, generations, search, timeline, trending
+from .models import Comment, Follow, Post, User
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Make ``auto_now_add`` fields of ``models`` store the values given.
+
+    ``bulk_create`` runs ``pre_save`` on every field, which would stamp all
+    rows with the current time. Only meant for management commands: the
+    fields are switched process-wide while the block runs.
+    """
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+@contextmanager
+def deferred_indexes(*models):
+    """Drop the ``Meta.indexes`` of ``models`` and build them at the end.
+
+    Filling a table and indexing it once is faster than keeping the
+    indexes up to date row by row. Unique constraints stay in place, but
+    the foreign keys of Post, Comment and Follow that have no index of
+    their own (``db_index=False``, covered by a composite ``Meta`` index)
+    are unindexed until the block ends: don't read by them in between.
+    """
+    indexes = [(model, index) for model in models
+               for index in model._meta.indexes]
+    with connection.schema_editor() as editor:
+        for model, index in indexes:
+            editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+
+
+def insert(model, objs, batch_size=None):
+    """``bulk_create`` that returns the primary keys, in order of ``objs``.
+
+    Backends that can't return them from the insert get them read back,
+    which relies on nothing else inserting into the table meanwhile.
+    """
+    if not objs:
+        return []
+    last_pk = model.objects.aggregate(last=Max('pk'))['last'] or 0
+    created = model.objects.bulk_create(objs, batch_size=batch_size)
+    if all(obj.pk is not None for obj in created):
+        return [obj.pk for obj in created]
+    return list(
+        model.objects.filter(pk__gt=last_pk).order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+
+def watermarks():
+    """The last primary keys of the tables bulk writes append to."""
+    return {
+        model: model.objects.aggregate(last=Max('pk'))['last'] or 0
+        for model in (Post, Comment, Follow)
+    }
+
+
+def refresh_denormalized(stdout=None, since=None):
+    """Rebuild what the model signals maintain, after a bulk write.
+
+    Counters, timelines, trending scores and the search index are
+    recomputed and the index stamp is bumped, so cached pages go stale.
+    With ``since``, the ``watermarks()`` taken before the write, only the
+    rows appended after them and the users and posts they touch are
+    refreshed; otherwise the whole site is.
+    """
+    if since is None:
+        call_command('recount_counters', stdout=stdout)
+        with transaction.atomic():
+            timeline.rebuild()
+        trending.rebuild()
+        if search.available():
+            call_command('rebuild_search_index', stdout=stdout)
+        counters.forget_total()
+        generations.bump('index', 0)
+        return
+    posts = Post.objects.filter(pk__gt=since[Post])
+    comments = Comment.objects.filter(pk__gt=since[Comment])
+    follows = Follow.objects.filter(pk__gt=since[Follow])
+    authors = User.objects.filter(
+        Q(pk__in=posts.values('author_id'))
+        | Q(pk__in=follows.values('author_id'))
+    ).values('pk')
+    users = User.objects.filter(
+        Q(pk__in=authors) | Q(pk__in=follows.values('user_id'))
+    )
+    touched = Post.objects.filter(
+        Q(pk__gt=since[Post]) | Q(pk__in=comments.values('post_id'))
+    )
+    counters.recount(users, counters.recount_users)
+    counters.recount(touched, counters.recount_posts)
+    with transaction.atomic():
+        timeline.fill(authors)
+        timeline.trim(Follow.objects.filter(
+            author__in=authors
+        ).values('user_id'))
+    trending.rebuild(posts=touched.values('pk'))
+    if search.available():
+        with transaction.atomic():
+            search.index_since(since[Post], since[Comment])
+    counters.forget_total()
+    generations.bump('index', 0)
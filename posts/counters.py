@@ -0,0 +1,139 @@
+"""Denormalized counters shown on profile cards and post lists.
+
+The counters are moved with ``F()`` updates by the model signals, inside
+the transaction of the write that changes them. ``recount_counters``
+rebuilds them from scratch.
+
+The number of all posts, for the pages of ``/``, lives in the cache: it is
+counted once and then moved by the signals when their write commits.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import AuthorStats, Comment, Follow, Post, User
+
+TOTAL_POSTS_KEY = 'counters:total_posts'
+# Recounted this often, in case a count raced with a write. Seconds.
+TOTAL_POSTS_TIMEOUT = 60 * 60
+
+
+def _count(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field)
+        .annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField(),
+    ), 0)
+
+
+def _totals(users):
+    return users.annotate(
+        total_posts=_count(Post, 'author'),
+        total_followers=_count(Follow, 'author'),
+        total_following=_count(Follow, 'user'),
+    ).values_list('pk', 'total_posts', 'total_followers', 'total_following')
+
+
+def recount_users(users):
+    """Rebuild stats rows for ``users`` with one query per table."""
+    rows = _totals(users)
+    stats = [
+        AuthorStats(user_id=pk, posts_count=posts, followers_count=followers,
+                    following_count=following)
+        for pk, posts, followers, following in rows
+    ]
+    AuthorStats.objects.filter(
+        user__in=[row.user_id for row in stats]
+    ).delete()
+    AuthorStats.objects.bulk_create(stats)
+    return stats
+
+
+def recount_posts(posts):
+    return posts.update(comments_count=_count(Comment, 'post'))
+
+
+def recount(queryset, recount, chunk_size=1000):
+    """Walk ``queryset`` in primary key ranges, one transaction each.
+
+    Returns how many rows were recounted.
+    """
+    total = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not pks:
+            return total
+        with transaction.atomic():
+            recount(queryset.filter(pk__gte=pks[0], pk__lte=pks[-1]))
+        total += len(pks)
+        last_pk = pks[-1]
+
+
+def _create(user_id):
+    """The stats row of ``user_id``, counted if it does not exist yet."""
+    pk, posts, followers, following = _totals(
+        User.objects.filter(pk=user_id)
+    ).get()
+    stats, created = AuthorStats.objects.get_or_create(user_id=pk, defaults={
+        'posts_count': posts,
+        'followers_count': followers,
+        'following_count': following,
+    })
+    return stats
+
+
+def author_stats(user):
+    try:
+        return user.stats
+    except AuthorStats.DoesNotExist:
+        return _create(user.pk)
+
+
+def _moved(field, delta):
+    # Counters that drifted below the truth stop at zero instead of
+    # failing the CHECK constraint of the unsigned column.
+    return Greatest(F(field) + delta, 0)
+
+
+def bump_user(user_id, **deltas):
+    updated = AuthorStats.objects.filter(user_id=user_id).update(
+        **{field: _moved(field, delta) for field, delta in deltas.items()}
+    )
+    if not updated and all(delta > 0 for delta in deltas.values()):
+        _create(user_id)
+
+
+def bump_post(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=_moved('comments_count', delta)
+    )
+
+
+def total_posts():
+    total = cache.get(TOTAL_POSTS_KEY)
+    if total is None:
+        total = Post.objects.count()
+        cache.add(TOTAL_POSTS_KEY, total, TOTAL_POSTS_TIMEOUT)
+    return total
+
+
+def _move_total(delta):
+    try:
+        cache.incr(TOTAL_POSTS_KEY, delta)
+    except ValueError:
+        pass
+
+
+def bump_total(delta):
+    transaction.on_commit(lambda: _move_total(delta))
+
+
+def forget_total():
+    """Have the next ``total_posts`` count again, after a bulk write."""
+    cache.delete(TOTAL_POSTS_KEY)
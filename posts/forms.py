@@ -1,6 +1,8 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import ModelForm
 
+from .images import normalize
 from .models import Comment, Post
 
 
@@ -18,6 +20,19 @@ class PostForm(ModelForm):
             'image': 'Вставьте изображение'
         }
 
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        # The width and height are set by the model field.
+        if isinstance(image, UploadedFile):
+            image = normalize(image)
+            self.instance.image_size = image.size
+        elif not image:
+            self.instance.image_size = None
+        else:
+            # None keeps the stored file, which would be measured again.
+            return None
+        return image
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
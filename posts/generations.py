@@ -0,0 +1,47 @@
+"""Generation stamps for cache invalidation.
+
+Every post, user and group has a stamp in the cache that is bumped on each
+write touching it. Cache keys that embed the stamps go stale on their own,
+nothing has to be deleted. A stamp missing from the cache is recreated
+from the clock, so it can never collide with a key written before.
+
+Stamps move once the write commits: bumped earlier, a concurrent reader
+could still see the old rows and cache them under the new stamp.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+TIMEOUT = None
+
+
+def key(kind, pk):
+    return f'gen:{kind}:{pk}'
+
+
+def _fresh():
+    return time.time_ns() // 1000
+
+
+def _incr(name):
+    try:
+        cache.incr(name)
+    except ValueError:
+        cache.set(name, _fresh(), TIMEOUT)
+
+
+def bump(kind, pk):
+    """Bump a stamp when the current transaction commits, or right away."""
+    name = key(kind, pk)
+    transaction.on_commit(lambda: _incr(name))
+
+
+def get_many(keys):
+    """Return stamps for ``keys``, creating the missing ones."""
+    stamps = cache.get_many(keys)
+    missing = {name: _fresh() for name in keys if name not in stamps}
+    if missing:
+        cache.set_many(missing, TIMEOUT)
+        stamps.update(missing)
+    return stamps
@@ -0,0 +1,47 @@
+"""Upload-time normalization of post images."""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from PIL import Image, ImageOps
+
+FORMATS = {
+    'JPEG': {'quality': 85, 'optimize': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 85},
+}
+# Multi-picture JPEGs from phone cameras; the first picture is kept.
+ALIASES = {'MPO': 'JPEG'}
+
+
+def normalize(upload):
+    """Return the file to store for an uploaded image.
+
+    JPEG (MPO included), PNG and WebP images are rotated according to their
+    EXIF orientation, shrunk to ``IMAGE_MAX_SIZE`` on the longer side and
+    saved again without metadata. Other formats (animated GIFs) are kept as
+    is.
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    image_format = ALIASES.get(image.format, image.format)
+    if image_format not in FORMATS:
+        upload.seek(0)
+        return upload
+
+    image = ImageOps.exif_transpose(image)
+    max_size = settings.IMAGE_MAX_SIZE
+    image.thumbnail((max_size, max_size), Image.LANCZOS)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    output = BytesIO()
+    image.save(output, image_format, **FORMATS[image_format])
+    size = output.tell()
+    output.seek(0)
+    name = os.path.basename(upload.name)
+    normalized = InMemoryUploadedFile(
+        output, 'image', name, Image.MIME[image_format], size, None
+    )
+    return normalized
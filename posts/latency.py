@@ -0,0 +1,32 @@
+"""Latency summaries shared by the benchmark and replay commands."""
+import bisect
+import math
+
+# Upper bounds of the histogram buckets, in milliseconds.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted ``values``."""
+    rank = max(math.ceil(q / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def histogram(values, buckets=BUCKETS):
+    """Count ``values`` per bucket, ``{'<=5': n, ..., '>5000': n}``."""
+    counts = [0] * (len(buckets) + 1)
+    for value in values:
+        counts[bisect.bisect_left(buckets, value)] += 1
+    labels = [f'<={bound}' for bound in buckets] + [f'>{buckets[-1]}']
+    return dict(zip(labels, counts))
+
+
+def summary(timings):
+    """p50/p95/p99 and mean of a list of milliseconds."""
+    timings = sorted(timings)
+    return {
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+    }
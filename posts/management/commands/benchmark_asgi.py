@@ -0,0 +1,86 @@
+import datetime
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.async_urls import ASYNC_VIEWS
+from posts.latency import summary
+from posts.management.commands.benchmark_urls import git_commit, url_targets
+from posts.replay import Request, replay, replay_asgi, session_cookie
+
+MODES = {
+    'wsgi': lambda requests, concurrency: replay(requests, concurrency),
+    'asgi': replay_asgi,
+}
+
+
+class Command(BaseCommand):
+    help = ('Load the hot read views through yatube.wsgi and yatube.asgi '
+            'at several concurrency levels; report requests per second '
+            'and latency percentiles')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests per URL and run')
+        parser.add_argument('--concurrency', type=int, action='append',
+                            help='Requests in flight, repeatable; '
+                                 'default 1, 8 and 32')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Untimed requests per URL and mode')
+        parser.add_argument('--url', action='append', dest='urls',
+                            help=f'Only these of {", ".join(ASYNC_VIEWS)}')
+        parser.add_argument('--output', help='Also write the report as JSON')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+        levels = options['concurrency'] or [1, 8, 32]
+        requests = self.requests(options['urls'] or list(ASYNC_VIEWS))
+        for run in MODES.values():
+            run(requests * options['warmup'], max(levels))
+
+        runs = []
+        for concurrency in levels:
+            for mode, run in MODES.items():
+                results, duration = run(requests * options['requests'],
+                                        concurrency)
+                runs.append({
+                    'mode': mode,
+                    'concurrency': concurrency,
+                    'requests': len(results),
+                    'errors': sum(1 for result in results
+                                  if result.status != 200),
+                    'rps': round(len(results) / duration, 1),
+                    **summary([result.milliseconds for result in results]),
+                })
+                self.stdout.write(
+                    f'{mode} x{concurrency:<4} {runs[-1]["rps"]:8.1f} req/s  '
+                    f'p50 {runs[-1]["p50_ms"]:8.2f} ms  '
+                    f'p95 {runs[-1]["p95_ms"]:8.2f} ms  '
+                    f'p99 {runs[-1]["p99_ms"]:8.2f} ms  '
+                    f'{runs[-1]["errors"]} errors'
+                )
+        if options['output']:
+            report = {
+                'commit': git_commit(),
+                'created': datetime.datetime.now().isoformat(),
+                'paths': {request.name: request.path for request in requests},
+                'runs': runs,
+            }
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2, ensure_ascii=False)
+                file.write('\n')
+
+    @staticmethod
+    def requests(names):
+        """One request per URL name, logged in where the view needs it."""
+        unknown = set(names) - set(ASYNC_VIEWS)
+        if unknown:
+            raise CommandError(f'No async view for {", ".join(unknown)}')
+        targets = url_targets()
+        requests = []
+        for name in names:
+            path, user = targets[name]
+            cookie = session_cookie(user) if user is not None else None
+            requests.append(Request(0, 'GET', path, name, cookie))
+        return requests
@@ -0,0 +1,110 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from posts.sqlite_cache import SQLiteCache
+
+OPERATIONS = ('set', 'get', 'set_many', 'get_many', 'incr')
+# Keys per set_many/get_many call, like a page of post cards.
+MANY = 10
+
+
+def backends(directory, max_entries):
+    params = {'OPTIONS': {'MAX_ENTRIES': max_entries}}
+    return {
+        'locmem': LocMemCache('benchmark', params),
+        'filebased': FileBasedCache(os.path.join(directory, 'files'), params),
+        'sqlite': SQLiteCache(os.path.join(directory, 'cache.sqlite3'),
+                              params),
+    }
+
+
+def run(cache, operation, count, worker=0):
+    """Run ``count`` calls of ``operation``; return the seconds taken."""
+    value = {'html': 'x' * 2000}
+    keys = [f'bench:{worker}:{number}' for number in range(count)]
+    if operation in ('get', 'get_many'):
+        cache.set_many({key: value for key in keys})
+    if operation == 'incr':
+        cache.set('bench:counter', 0)
+    start = time.perf_counter()
+    if operation == 'set':
+        for key in keys:
+            cache.set(key, value)
+    elif operation == 'get':
+        for key in keys:
+            cache.get(key)
+    elif operation == 'set_many':
+        for number in range(count):
+            cache.set_many({f'{key}:{number}': value
+                            for key in keys[:MANY]})
+    elif operation == 'get_many':
+        for number in range(count):
+            cache.get_many(keys[number:number + MANY])
+    elif operation == 'incr':
+        for _ in range(count):
+            cache.incr('bench:counter')
+    return time.perf_counter() - start
+
+
+def _worker(args):
+    name, directory, max_entries, operation, count, worker = args
+    cache = backends(directory, max_entries)[name]
+    return run(cache, operation, count, worker)
+
+
+class Command(BaseCommand):
+    help = ('Compare the SQLite cache backend with LocMemCache and '
+            'FileBasedCache, in operations per second')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=500,
+                            help='Calls per operation and process')
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Run the calls from this many processes '
+                                 'at once')
+        parser.add_argument('--backend', action='append',
+                            dest='backends',
+                            help='Only these of locmem, filebased, sqlite')
+        parser.add_argument('--output', help='Also write the results as JSON')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        processes = options['processes']
+        max_entries = count * processes * (MANY + 1)
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            names = options['backends'] or list(backends(directory, 1))
+            for name in names:
+                results[name] = {}
+                for operation in OPERATIONS:
+                    jobs = [(name, directory, max_entries, operation, count,
+                             worker) for worker in range(processes)]
+                    start = time.perf_counter()
+                    if processes == 1:
+                        _worker(jobs[0])
+                    else:
+                        with multiprocessing.Pool(processes) as pool:
+                            pool.map(_worker, jobs)
+                    elapsed = time.perf_counter() - start
+                    results[name][operation] = round(
+                        count * processes / elapsed
+                    )
+        self.stdout.write(f'{"ops/s":<10}' + ''.join(
+            f'{operation:>12}' for operation in OPERATIONS
+        ))
+        for name, result in results.items():
+            self.stdout.write(f'{name:<10}' + ''.join(
+                f'{result[operation]:>12}' for operation in OPERATIONS
+            ))
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump({'count': count, 'processes': processes,
+                           'ops_per_second': results}, file, indent=2)
+                file.write('\n')
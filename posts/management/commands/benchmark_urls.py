@@ -0,0 +1,166 @@
+import datetime
+import json
+import subprocess
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from posts.latency import summary
+from posts.models import Comment, Follow, Group, Post, User
+from posts.querycount import QueryRecorder
+from posts.replay import REMOTE_ADDR
+from posts.urls import urlpatterns
+
+# Views that write or only render an error page.
+SKIPPED = {
+    '404': 'error page',
+    '500': 'error page',
+    'profile_follow': 'writes',
+    'profile_unfollow': 'writes',
+    'add_comment': 'writes',
+    'export': 'staff dump',
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def url_targets():
+    """``{url name: (path, user to log in as or None)}``.
+
+    The busiest objects of the dataset are picked: the author with most
+    posts, their most commented post, the biggest group and the user
+    following most authors.
+    """
+    author = User.objects.order_by('-stats__posts_count', 'pk').first()
+    post = Post.objects.filter(author=author).order_by(
+        '-comments_count', '-pk'
+    ).first()
+    group = Group.objects.annotate(total=Count('posts')).order_by(
+        '-total', 'pk'
+    ).first()
+    reader = User.objects.order_by('-stats__following_count', 'pk').first()
+    if post is None or group is None:
+        raise CommandError('No data to benchmark, run generate_dataset')
+    word = post.text.split()[0] if post.text.split() else 'a'
+    post_kwargs = {'username': author.username, 'post_id': post.pk}
+    return {
+        'index': (reverse('index'), None),
+        'trending': (reverse('trending'), None),
+        'group': (reverse('group', args=[group.slug]), None),
+        'search': (f'{reverse("search")}?q={word}', None),
+        'new_post': (reverse('new_post'), author),
+        'follow_index': (reverse('follow_index'), reader),
+        'profile': (reverse('profile', args=[author.username]), None),
+        'post': (reverse('post', kwargs=post_kwargs), None),
+        'post_comments': (reverse('post_comments', kwargs=post_kwargs),
+                          None),
+        'post_edit': (reverse('post_edit', kwargs=post_kwargs), author),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Request every named URL of posts/urls.py and report latency '
+            'percentiles, queries per request and peak memory as JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Timed requests per URL')
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--memory-requests', type=int, default=3,
+                            help='Requests per URL run under tracemalloc')
+        parser.add_argument('--url', action='append', dest='urls',
+                            help='Only benchmark these URL names')
+        parser.add_argument('--output', help='Write JSON here, not stdout')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+        targets = url_targets()
+        names = options['urls'] or [
+            pattern.name for pattern in urlpatterns if pattern.name
+        ]
+        results = {}
+        skipped = {}
+        for name in names:
+            if name in SKIPPED or name not in targets:
+                skipped[name] = SKIPPED.get(name, 'no benchmark target')
+                continue
+            path, user = targets[name]
+            results[name] = self.measure(
+                self.client(user), path, options['requests'],
+                options['warmup'], options['memory_requests'],
+            )
+            results[name]['path'] = path
+        report = {
+            'commit': git_commit(),
+            'created': datetime.datetime.now().isoformat(),
+            'requests': options['requests'],
+            'dataset': {
+                'users': User.objects.count(),
+                'groups': Group.objects.count(),
+                'posts': Post.objects.count(),
+                'comments': Comment.objects.count(),
+                'follows': Follow.objects.count(),
+            },
+            'urls': results,
+            'skipped': skipped,
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+            for name, result in results.items():
+                self.stdout.write(
+                    f'{name:<16} p50 {result["p50_ms"]:8.2f} ms  '
+                    f'p95 {result["p95_ms"]:8.2f} ms  '
+                    f'p99 {result["p99_ms"]:8.2f} ms  '
+                    f'{result["queries"]:3} queries  '
+                    f'{result["peak_memory_kb"]:8.1f} KiB'
+                )
+        else:
+            self.stdout.write(output)
+
+    def client(self, user):
+        client = Client(REMOTE_ADDR=REMOTE_ADDR)
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def measure(self, client, path, count, warmup, memory_count):
+        for _ in range(warmup):
+            client.get(path)
+        timings = []
+        queries = []
+        for _ in range(count):
+            with QueryRecorder() as recorder:
+                start = time.perf_counter()
+                response = client.get(path)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(recorder))
+        peak = 0
+        tracemalloc.start()
+        try:
+            for _ in range(memory_count):
+                tracemalloc.reset_peak()
+                client.get(path)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+        return {
+            'status': response.status_code,
+            **summary(timings),
+            'queries': max(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+
+
+def referenced(names):
+    return set(Post.objects.filter(image__in=names).values_list(
+        'image', flat=True
+    ))
+
+
+class Command(BaseCommand):
+    help = 'Delete the stored post images that no post refers to'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=float, default=24 * 60 * 60,
+            help='Keep files written or reused less than this many '
+                 'seconds ago',
+        )
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        deleted = field.storage.collect(
+            field.upload_to.rstrip('/'), referenced, options['min_age']
+        )
+        self.stdout.write(f'Deleted {len(deleted)} unused images')
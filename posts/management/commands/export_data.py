@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = 'Stream posts, comments, follows or groups as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=sorted(export.TABLES))
+        parser.add_argument('--format', choices=sorted(export.FORMATS),
+                            default='ndjson')
+        parser.add_argument('--since',
+                            help='Only posts and comments dated from this '
+                                 'ISO date or datetime on')
+        parser.add_argument('--chunk-size', type=int,
+                            default=export.CHUNK_SIZE)
+        parser.add_argument('--output', help='Write here, not stdout')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = export.parse_moment(options['since'])
+            if since is None:
+                raise CommandError(f'Bad --since: {options["since"]}')
+        lines = export.lines(options['table'], options['format'], since,
+                             options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', newline='') as file:
+                file.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
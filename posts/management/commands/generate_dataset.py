@@ -0,0 +1,163 @@
+import datetime
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from posts.bulk import explicit_timestamps, insert, refresh_denormalized
+from posts.models import Comment, Follow, Group, Post, User
+
+WORDS = (
+    'день вечер город море лес кофе книга поезд дорога музыка друзья '
+    'работа отпуск погода снег солнце дождь кино фото проект код идея '
+    'новость утро ночь выходные прогулка кот собака сад дом'
+).split()
+
+
+def zipf_weights(count, skew):
+    """Cumulative weights of ranks ``1..count`` under a power law."""
+    return list(itertools.accumulate(
+        1 / rank ** skew for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic dataset with power-law skew for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--follows', type=int, default=20,
+                            help='Average number of authors a user follows')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Exponent of the power law of authorship, '
+                                 'followers and comments')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Spread publication dates over this period')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.skew = options['skew']
+        self.now = timezone.now()
+        self.start = self.now - datetime.timedelta(days=options['days'])
+
+        with transaction.atomic():
+            groups = self.create_groups(options['groups'])
+            users = self.create_users(options['users'])
+            authors = self.ranked(users)
+            posts = self.create_posts(authors, groups, options['posts'])
+            comments = self.create_comments(users, posts, options['comments'])
+            follows = self.create_follows(authors, options['follows'])
+        self.stdout.write(
+            f'Created {len(groups)} groups, {len(users)} users, '
+            f'{len(posts)} posts, {comments} comments, {follows} follows'
+        )
+
+        refresh_denormalized(self.stdout)
+
+    def new_pks(self, model, objs):
+        return insert(model, objs, self.batch_size)
+
+    def text(self, low, high):
+        return ' '.join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    def moment(self, since):
+        span = (self.now - since).total_seconds()
+        return since + datetime.timedelta(seconds=self.rng.uniform(0, span))
+
+    def create_groups(self, count):
+        first = (Group.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        return self.new_pks(Group, [
+            Group(title=f'Группа {number}', slug=f'group-{number}',
+                  description=self.text(5, 20))
+            for number in range(first, first + count)
+        ])
+
+    def create_users(self, count):
+        first = (User.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        password = make_password('password')
+        return self.new_pks(User, [
+            User(username=f'user{number}', password=password)
+            for number in range(first, first + count)
+        ])
+
+    def create_posts(self, authors, groups, count):
+        """Authors are drawn by a power law over their ranking."""
+        weights = zipf_weights(len(authors), self.skew)
+        posts = []
+        for author_id in self.rng.choices(authors, cum_weights=weights,
+                                          k=count):
+            group_id = None
+            if groups and self.rng.random() < 0.7:
+                group_id = self.rng.choice(groups)
+            posts.append(Post(
+                author_id=author_id,
+                group_id=group_id,
+                text=self.text(5, 80),
+                pub_date=self.moment(self.start),
+            ))
+        with explicit_timestamps(Post):
+            pks = self.new_pks(Post, posts)
+        return list(zip(pks, (post.pub_date for post in posts)))
+
+    def create_comments(self, users, posts, count):
+        """A few posts draw most of the comments."""
+        if not users or not posts:
+            return 0
+        ranked = self.ranked(posts)
+        weights = zipf_weights(len(ranked), self.skew)
+        comments = [
+            Comment(
+                post_id=post_id,
+                author_id=self.rng.choice(users),
+                text=self.text(2, 30),
+                created=self.moment(pub_date),
+            )
+            for post_id, pub_date in self.rng.choices(
+                ranked, cum_weights=weights, k=count
+            )
+        ]
+        with explicit_timestamps(Comment):
+            Comment.objects.bulk_create(comments, batch_size=self.batch_size)
+        return len(comments)
+
+    def create_follows(self, authors, average):
+        """Every user follows about ``average`` authors, mostly prolific ones.
+
+        Repeated draws collapse, so the most popular authors are followed by
+        nearly everyone and users end up following somewhat fewer.
+        """
+        if len(authors) < 2:
+            return 0
+        weights = zipf_weights(len(authors), self.skew)
+        follows = []
+        for user_id in authors:
+            count = min(
+                int(self.rng.expovariate(1 / average)) if average else 0,
+                len(authors) - 1,
+            )
+            followed = set(self.rng.choices(
+                authors, cum_weights=weights, k=count
+            ))
+            followed.discard(user_id)
+            follows.extend(
+                Follow(user_id=user_id, author_id=author_id)
+                for author_id in followed
+            )
+        Follow.objects.bulk_create(follows, batch_size=self.batch_size,
+                                   ignore_conflicts=True)
+        return len(follows)
+
+    def ranked(self, items):
+        ranked = list(items)
+        self.rng.shuffle(ranked)
+        return ranked
@@ -0,0 +1,178 @@
+import contextlib
+import csv
+import datetime
+import itertools
+import json
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts.bulk import (deferred_indexes, explicit_timestamps, insert,
+                        refresh_denormalized, watermarks)
+from posts.export import parse_moment
+from posts.models import Comment, Follow, Group, Post, User
+
+# Tables in import order: comments refer to the ids of imported posts.
+TABLES = {
+    'posts': Post,
+    'comments': Comment,
+    'follows': Follow,
+}
+
+
+def records(path, format=None):
+    """Yield dicts from an NDJSON or CSV file, by extension by default."""
+    if format is None:
+        format = 'csv' if path.endswith('.csv') else 'ndjson'
+    with open(path, newline='') as file:
+        if format == 'csv':
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = ('Bulk import posts, comments and follows from NDJSON or CSV, '
+            'keeping their dates')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts',
+                            help='Rows with id, text, pub_date, author, '
+                                 'group and image')
+        parser.add_argument('--comments',
+                            help='Rows with post (an id from --posts), '
+                                 'author, text and created')
+        parser.add_argument('--follows', help='Rows with user and author')
+        parser.add_argument('--format', choices=('ndjson', 'csv'),
+                            help='Default: by file extension')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows per bulk insert and transaction')
+        parser.add_argument('--create-users', action='store_true',
+                            help='Create unknown usernames without password')
+        parser.add_argument('--create-groups', action='store_true',
+                            help='Create unknown group slugs')
+        parser.add_argument('--defer-indexes', action='store_true',
+                            help='Drop the composite indexes while loading '
+                                 'and build them once at the end')
+        parser.add_argument('--full-refresh', action='store_true',
+                            help='Rebuild the counters, timelines and search '
+                                 'index of the whole site, not only of the '
+                                 'imported rows')
+
+    def handle(self, *args, **options):
+        tables = [name for name in TABLES if options[name]]
+        if not tables:
+            raise CommandError('Pass --posts, --comments or --follows')
+        self.options = options
+        self.now = datetime.datetime.now()
+        self.users = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.post_ids = {}
+        since = None if options['full_refresh'] else watermarks()
+
+        deferred = contextlib.nullcontext()
+        if options['defer_indexes']:
+            deferred = deferred_indexes(*(TABLES[name] for name in tables))
+        with deferred, explicit_timestamps(Post, Comment):
+            for name in tables:
+                self.load(name, options[name])
+        refresh_denormalized(self.stdout, since)
+
+    def load(self, name, path):
+        build = {
+            'posts': self.build_post,
+            'comments': self.build_comment,
+            'follows': self.build_follow,
+        }[name]
+        rows = records(path, self.options['format'])
+        total = skipped = 0
+        start = time.perf_counter()
+        while True:
+            batch = list(itertools.islice(rows, self.options['batch_size']))
+            if not batch:
+                break
+            with transaction.atomic():
+                self.create_missing(batch)
+                built = [(record, build(record)) for record in batch]
+                objs = [obj for record, obj in built if obj is not None]
+                self.save(name, built, objs)
+            total += len(objs)
+            skipped += len(batch) - len(objs)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{name}: {total} rows in {elapsed:.1f} s, '
+            f'{total / elapsed if elapsed else 0:.0f} rows/s, '
+            f'{skipped} skipped'
+        )
+
+    def save(self, name, built, objs):
+        if name == 'posts':
+            pks = iter(insert(Post, objs))
+            for record, obj in built:
+                if obj is not None:
+                    pk = next(pks)
+                    if record.get('id') not in (None, ''):
+                        self.post_ids[str(record['id'])] = pk
+        else:
+            TABLES[name].objects.bulk_create(
+                objs, ignore_conflicts=name == 'follows'
+            )
+
+    def create_missing(self, batch):
+        """Create the users and groups of ``batch`` asked for and missing."""
+        if self.options['create_users']:
+            names = {
+                record[field] for record in batch
+                for field in ('author', 'user')
+                if record.get(field) and record[field] not in self.users
+            }
+            users = [User(username=name, password=make_password(None))
+                     for name in sorted(names)]
+            self.users.update(zip(sorted(names), insert(User, users)))
+        if self.options['create_groups']:
+            slugs = sorted({
+                record['group'] for record in batch
+                if record.get('group') and record['group'] not in self.groups
+            })
+            groups = [Group(title=slug, slug=slug) for slug in slugs]
+            self.groups.update(zip(slugs, insert(Group, groups)))
+
+    def moment(self, value):
+        """A date of the source, now when it is empty, None when invalid."""
+        if not value:
+            return self.now
+        return parse_moment(value)
+
+    def build_post(self, record):
+        author_id = self.users.get(record.get('author'))
+        group_id = None
+        if record.get('group'):
+            group_id = self.groups.get(record['group'])
+            if group_id is None:
+                return None
+        pub_date = self.moment(record.get('pub_date'))
+        if author_id is None or pub_date is None:
+            return None
+        return Post(text=record.get('text', ''), pub_date=pub_date,
+                    author_id=author_id, group_id=group_id,
+                    image=record.get('image') or None)
+
+    def build_comment(self, record):
+        post_id = self.post_ids.get(str(record.get('post')))
+        author_id = self.users.get(record.get('author'))
+        created = self.moment(record.get('created'))
+        if post_id is None or author_id is None or created is None:
+            return None
+        return Comment(post_id=post_id, author_id=author_id,
+                       text=record.get('text', ''), created=created)
+
+    def build_follow(self, record):
+        user_id = self.users.get(record.get('user'))
+        author_id = self.users.get(record.get('author'))
+        if user_id is None or author_id is None or user_id == author_id:
+            return None
+        return Follow(user_id=user_id, author_id=author_id)
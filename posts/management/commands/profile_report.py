@@ -0,0 +1,50 @@
+import io
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import parse_moment
+from posts.profiling import dumps, merge
+
+SORTS = ('cumulative', 'tottime', 'ncalls', 'pcalls')
+
+
+class Command(BaseCommand):
+    help = ('Merge the cProfile dumps of ProfilingMiddleware and rank the '
+            'functions across all profiled requests')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', dest='urls',
+                            help='Only dumps of these URL names')
+        parser.add_argument('--since',
+                            help='Only dumps taken from this ISO moment on')
+        parser.add_argument('--sort', choices=SORTS, default='cumulative')
+        parser.add_argument('--limit', type=int, default=30,
+                            help='Functions to list')
+        parser.add_argument('--dir', help='Default: PROFILE_DIR')
+        parser.add_argument('--output',
+                            help='Also write the merged pstats dump here')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_moment(options['since'])
+            if since is None:
+                raise CommandError(f'Invalid --since: {options["since"]}')
+        found = dumps(options['urls'], since, options['dir'])
+        if not found:
+            raise CommandError('No profile dumps found')
+        counts = Counter(name for name, moment, path in found)
+        self.stdout.write(
+            f'Dumps: {len(found)}, {found[0][1]:%Y-%m-%d %H:%M:%S} '
+            f'to {found[-1][1]:%Y-%m-%d %H:%M:%S}: '
+            + ', '.join(f'{name} {count}'
+                        for name, count in counts.most_common())
+        )
+        report = io.StringIO()
+        stats = merge([path for name, moment, path in found], stream=report)
+        if options['output']:
+            stats.dump_stats(options['output'])
+        stats.strip_dirs().sort_stats(options['sort'])
+        stats.print_stats(options['limit'])
+        self.stdout.write(report.getvalue(), ending='')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = ('Print an X-Profile header value that makes requests get '
+            'profiled, for PROFILE_TOKEN_MAX_AGE seconds')
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_token())
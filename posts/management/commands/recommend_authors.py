@@ -0,0 +1,34 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import recommendations
+
+
+class Command(BaseCommand):
+    help = ('Precompute who-to-follow recommendations of every user from '
+            'the follow graph')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=recommendations.TOP,
+                            help='Authors recommended to each user')
+        parser.add_argument('--processes', type=int,
+                            default=os.cpu_count() or 1)
+        parser.add_argument('--active-days', type=int,
+                            default=recommendations.ACTIVE_DAYS,
+                            help='Window of the posts counted as activity')
+        parser.add_argument('--chunk-size', type=int,
+                            default=recommendations.CHUNK_SIZE,
+                            help='Users scored per task')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        users = recommendations.rebuild(
+            options['top'], options['processes'], options['active_days'],
+            options['chunk_size'],
+        )
+        self.stdout.write(
+            f'Recommended authors to {users} users in '
+            f'{time.perf_counter() - start:.1f} s'
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import (forget_total, recount, recount_posts,
+                            recount_users)
+from posts.models import Post, User
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized post, follower and comment counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        users = recount(User.objects.all(), recount_users, chunk_size)
+        posts = recount(Post.objects.all(), recount_posts, chunk_size)
+        forget_total()
+        self.stdout.write(f'Recounted {users} users and {posts} posts')
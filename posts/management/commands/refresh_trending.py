@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.trending import rebuild
+
+
+class Command(BaseCommand):
+    help = ('Recompute the trending scores of recent posts and drop the '
+            'posts older than TRENDING_WINDOW')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            help='Keep refreshing, this many seconds apart')
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.perf_counter()
+            posts = rebuild()
+            self.stdout.write(
+                f'{posts} trending posts scored in '
+                f'{time.perf_counter() - start:.2f} s'
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,105 @@
+import json
+import sys
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.latency import histogram, summary
+from posts.replay import PathMapper, parse_log, replay
+
+
+class Command(BaseCommand):
+    help = ('Replay a common log format or JSON lines access log against '
+            'the WSGI application and report throughput, errors and '
+            'latency per URL name')
+
+    def add_arguments(self, parser):
+        parser.add_argument('log', help='Access log file, "-" for stdin')
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--processes', action='store_true',
+                            help='Use worker processes instead of threads')
+        parser.add_argument('--speed', type=float, default=0,
+                            help='Replay at the logged pace times this '
+                                 'factor; 0 sends as fast as possible')
+        parser.add_argument('--methods', default='GET,HEAD',
+                            help='Methods to replay, others are skipped')
+        parser.add_argument('--limit', type=int,
+                            help='Replay only the first N entries')
+        parser.add_argument('--output', help='Also write the report as JSON')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+        entries = self.read(options['log'])[:options['limit']]
+        methods = {method.strip().upper()
+                   for method in options['methods'].split(',')}
+        requests, skipped = PathMapper().requests(entries, methods)
+        if not requests:
+            raise CommandError('Nothing to replay')
+        results, duration = replay(
+            requests, options['workers'], options['processes'],
+            options['speed'],
+        )
+        report = self.report(results, duration, skipped)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+                file.write('\n')
+        self.write(report)
+
+    def read(self, path):
+        if path == '-':
+            return parse_log(sys.stdin)
+        try:
+            with open(path) as file:
+                return parse_log(file)
+        except OSError as error:
+            raise CommandError(error)
+
+    @staticmethod
+    def report(results, duration, skipped):
+        """Errors are 5xx responses and requests that raised."""
+        by_name = defaultdict(list)
+        for result in results:
+            by_name[result.name].append(result)
+        urls = {}
+        for name, group in sorted(by_name.items()):
+            timings = [result.milliseconds for result in group]
+            statuses = Counter(str(result.status) for result in group)
+            errors = sum(1 for result in group
+                         if not 0 < result.status < 500)
+            urls[name] = {
+                'requests': len(group),
+                'errors': errors,
+                'statuses': dict(sorted(statuses.items())),
+                **summary(timings),
+                'histogram': histogram(timings),
+            }
+        errors = sum(url['errors'] for url in urls.values())
+        return {
+            'requests': len(results),
+            'duration_s': round(duration, 3),
+            'throughput_rps': round(len(results) / duration, 2),
+            'error_rate': round(errors / len(results), 4),
+            'skipped': skipped,
+            'urls': urls,
+        }
+
+    def write(self, report):
+        self.stdout.write(
+            f'{report["requests"]} requests in {report["duration_s"]} s, '
+            f'{report["throughput_rps"]} req/s, '
+            f'error rate {report["error_rate"]:.2%}, skipped '
+            + ', '.join(f'{count} {reason}'
+                        for reason, count in report['skipped'].items())
+        )
+        for name, url in report['urls'].items():
+            self.stdout.write(
+                f'{name:<20} {url["requests"]:6}  errors {url["errors"]:4}  '
+                f'p50 {url["p50_ms"]:8.2f}  p95 {url["p95_ms"]:8.2f}  '
+                f'p99 {url["p99_ms"]:8.2f} ms'
+            )
+            self.stdout.write(' ' * 21 + '  '.join(
+                f'{bucket}: {count}'
+                for bucket, count in url['histogram'].items() if count
+            ))
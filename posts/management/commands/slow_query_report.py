@@ -0,0 +1,89 @@
+import datetime
+import json
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import parse_moment
+from posts.slowlog import read
+
+
+def summarize(entries):
+    """Per query shape totals of the log entries, most time spent first."""
+    shapes = defaultdict(list)
+    for entry in entries:
+        shapes[entry['shape']].append(entry)
+    summary = []
+    for shape, found in shapes.items():
+        durations = [entry['duration_ms'] for entry in found]
+        slowest = max(found, key=lambda entry: entry['duration_ms'])
+        summary.append({
+            'shape': shape,
+            'count': len(found),
+            'total_ms': round(sum(durations), 3),
+            'mean_ms': round(sum(durations) / len(durations), 3),
+            'max_ms': max(durations),
+            'views': Counter(entry['view'] for entry in found
+                             if entry['view']).most_common(3),
+            'templates': Counter(entry['template'] for entry in found
+                                 if entry['template']).most_common(3),
+            'code': Counter(entry['code'] for entry in found
+                            if entry['code']).most_common(3),
+            'sql': slowest['sql'],
+            'plan': slowest['plan'],
+        })
+    return sorted(summary, key=lambda shape: -shape['total_ms'])
+
+
+def _places(counts):
+    return ', '.join(f'{place} ({count})' for place, count in counts)
+
+
+class Command(BaseCommand):
+    help = ('Rank the query shapes of the slow query log by the total time '
+            'spent in them')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', help='Default: SLOW_QUERY_LOG')
+        parser.add_argument('--since',
+                            help='Only queries logged from this ISO moment on')
+        parser.add_argument('--view', action='append', dest='views',
+                            help='Only queries of these views')
+        parser.add_argument('--limit', type=int, default=20,
+                            help='Shapes to list')
+        parser.add_argument('--output',
+                            help='Also write the full summary as JSON here')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_moment(options['since'])
+            if since is None:
+                raise CommandError(f'Invalid --since: {options["since"]}')
+        entries = [
+            entry for entry in read(options['log'])
+            if (since is None
+                or datetime.datetime.fromisoformat(entry['time']) >= since)
+            and (not options['views'] or entry['view'] in options['views'])
+        ]
+        if not entries:
+            raise CommandError('No slow queries logged')
+        summary = summarize(entries)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(summary, file, ensure_ascii=False, indent=2)
+        self.stdout.write(
+            f'Queries: {len(entries)}, shapes: {len(summary)}, '
+            f'{sum(shape["total_ms"] for shape in summary):.1f} ms'
+        )
+        for rank, shape in enumerate(summary[:options['limit']], 1):
+            self.stdout.write(
+                f'\n{rank}. {shape["total_ms"]:.1f} ms total, '
+                f'{shape["count"]} x {shape["mean_ms"]:.1f} ms, '
+                f'max {shape["max_ms"]:.1f} ms\n   {shape["shape"]}'
+            )
+            for key in ('views', 'templates', 'code'):
+                if shape[key]:
+                    self.stdout.write(f'   {key}: {_places(shape[key])}')
+            for line in shape['plan'] or ():
+                self.stdout.write(f'   plan: {line}')
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from posts.routers import PRIMARY, REPLICA, sync_replica
+
+
+class Command(BaseCommand):
+    help = ('Copy the SQLite primary database onto the replica, standing '
+            'in for replication in local setups')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            help='Keep syncing, this many seconds apart')
+
+    def handle(self, *args, **options):
+        if REPLICA not in settings.DATABASES:
+            raise CommandError('No replica database is configured')
+        primary, replica = connections[PRIMARY], connections[REPLICA]
+        if primary.settings_dict['NAME'] == replica.settings_dict['NAME']:
+            raise CommandError('The replica is the primary database')
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('Only SQLite databases are synced here, '
+                               'use the replication of the database server')
+        while True:
+            start = time.perf_counter()
+            sync_replica()
+            self.stdout.write(
+                f'Replica synced in {time.perf_counter() - start:.2f} s'
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,117 @@
+import datetime
+import logging
+import time
+
+from django.conf import settings
+
+from . import metrics, profiling, routers, slowlog
+from .querycount import QueryBudgetExceeded, QueryRecorder, check_budget
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    """Profile a sample of requests with cProfile, see ``posts.profiling``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profiler = profiling.start() if profiling.wanted(request) else None
+        if profiler is None:
+            return self.get_response(request)
+        moment = datetime.datetime.now()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        match = request.resolver_match
+        profiling.save(profiler, match and match.url_name, moment)
+        return response
+
+
+class MetricsMiddleware:
+    """Record latency and SQL of every request, see ``posts.metrics``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        seconds = time.perf_counter() - start
+        match = request.resolver_match
+        metrics.record_request(
+            match.view_name if match else 'unresolved', seconds,
+            len(recorder),
+            sum(duration for sql, duration in recorder.queries),
+        )
+        return response
+
+
+class SlowQueryMiddleware:
+    """Name the view of the queries in the slow query log."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = slowlog.current_view.set(None)
+        try:
+            return self.get_response(request)
+        finally:
+            slowlog.current_view.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        slowlog.current_view.set(request.resolver_match.view_name)
+
+
+class QueryBudgetMiddleware:
+    """Check every request against ``posts.budgets`` and the N+1 detector.
+
+    Violations raise ``QueryBudgetExceeded`` when ``QUERY_BUDGET_STRICT`` is
+    on (tests) and are logged as warnings otherwise.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        match = request.resolver_match
+        if match is None or not match.url_name:
+            return response
+        problems = check_budget(match.url_name, recorder)
+        if problems:
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded('\n'.join(problems))
+            for problem in problems:
+                logger.warning(problem)
+        return response
+
+
+class ReplicaPinMiddleware:
+    """Route the reads of requests to the replica, see ``posts.routers``.
+
+    A request that wrote sets a cookie that keeps the reads of the user on
+    the primary for ``REPLICA_PIN_SECONDS``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = routers.begin_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.end_request(token)
+        if wrote:
+            response.set_cookie(
+                routers.PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
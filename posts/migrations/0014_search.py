@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-17 04:10
+
+from django.db import migrations
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS posts_search USING fts5('
+            'text, post_id UNINDEXED, '
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            'INSERT INTO posts_search (rowid, text, post_id) '
+            'SELECT 2 * id, text, id FROM posts_post'
+        )
+        cursor.execute(
+            'INSERT INTO posts_search (rowid, text, post_id) '
+            'SELECT 2 * id + 1, text, post_id FROM posts_comment'
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DROP TABLE IF EXISTS posts_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_image_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def trim_timelines(apps, schema_editor):
+    """Cut the timelines backfilled by 0011 to ``TIMELINE_LENGTH``."""
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    length = settings.TIMELINE_LENGTH
+    cutoff = (
+        TimelineEntry.objects.filter(user_id=OuterRef('user_id'))
+        .order_by('-pub_date')
+        .values('pub_date')[length:length + 1]
+    )
+    TimelineEntry.objects.filter(pub_date__lte=Subquery(cutoff)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_trendingscore'),
+    ]
+
+    operations = [
+        migrations.RunPython(trim_timelines, migrations.RunPython.noop),
+    ]
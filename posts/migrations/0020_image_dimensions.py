@@ -0,0 +1,49 @@
+# Generated by Django 3.2.25 on 2026-10-17 05:30
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.images import get_image_dimensions
+from django.db import migrations, models
+import posts.storage
+
+BATCH_SIZE = 500
+
+
+def fill_dimensions(apps, schema_editor):
+    """Measure the images of the posts saved before their size was kept."""
+    Post = apps.get_model('posts', 'Post')
+    storage = Post._meta.get_field('image').storage
+    posts = Post.objects.exclude(image='').filter(
+        image__isnull=False, image_width__isnull=True
+    ).only('image').order_by('pk')
+    fields = ['image_width', 'image_height', 'image_size']
+    measured = []
+    for post in posts.iterator():
+        try:
+            with storage.open(post.image.name) as file:
+                width, height = get_image_dimensions(file)
+            size = storage.size(post.image.name)
+        except (OSError, SuspiciousFileOperation):
+            continue
+        post.image_width, post.image_height = width, height
+        post.image_size = size
+        measured.append(post)
+        if len(measured) == BATCH_SIZE:
+            Post.objects.bulk_update(measured, fields)
+            measured = []
+    Post.objects.bulk_update(measured, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_trim_timelines'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, height_field='image_height', null=True, storage=posts.storage.ContentAddressedStorage(), upload_to='posts/', width_field='image_width'),
+        ),
+        migrations.RunPython(fill_dimensions, migrations.RunPython.noop),
+    ]
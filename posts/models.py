@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.signals import post_init
+
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
@@ -13,31 +16,68 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_list(self):
+        """Everything ``includes/post_item.html`` needs, in one query."""
+        return self.select_related('author', 'group')
+
+
 class Post(models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField('date published', auto_now_add=True,
                                     db_index=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE,
-                               related_name='posts')
+                               related_name='posts', db_index=False)
     group = models.ForeignKey(Group, on_delete=models.SET_NULL,
-                              blank=True, null=True, related_name='posts')
-    image = models.ImageField(upload_to='posts/', blank=True, null=True)
+                              blank=True, null=True, related_name='posts',
+                              db_index=False)
+    image = models.ImageField(upload_to='posts/', blank=True, null=True,
+                              storage=ContentAddressedStorage(),
+                              width_field='image_width',
+                              height_field='image_height')
+    image_width = models.PositiveIntegerField(blank=True, null=True,
+                                              editable=False)
+    image_height = models.PositiveIntegerField(blank=True, null=True,
+                                               editable=False)
+    image_size = models.PositiveIntegerField(blank=True, null=True,
+                                             editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(fields=('author', 'pub_date'),
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=('group', 'pub_date'),
+                         name='post_group_pub_date_idx'),
+        ]
 
     def __str__(self):
         return str(self.pk)
 
 
+# The image size is measured when a file is assigned and stored in the row
+# (filled for older rows by migration 0020). Django would also open the
+# file of every loaded post whose size is unknown.
+post_init.disconnect(Post.image.field.update_dimension_fields, sender=Post)
+
+
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE,
-                             related_name='comments')
+                             related_name='comments', db_index=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                related_name='comments')
     text = models.TextField()
     created = models.DateTimeField('date published', auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=('post', 'created'),
+                         name='comment_post_created_idx'),
+        ]
+
     def __str__(self):
         return f'{str(self.text)} from {str(self.author)}'
 
@@ -46,11 +86,75 @@ class Follow(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE,
                              related_name='follower')
     author = models.ForeignKey(User, on_delete=models.CASCADE,
-                               related_name='following')
+                               related_name='following', db_index=False)
 
     class Meta:
         unique_together = ('user', 'author')
+        indexes = [
+            models.Index(fields=('author', 'user'),
+                         name='follow_author_user_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user} followed {self.author}'
 
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='timeline')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='timeline_entries')
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=('user', '-pub_date'),
+                         name='timeline_user_pub_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post} in {self.user} timeline'
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE,
+                                primary_key=True, related_name='stats')
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0, db_index=True)
+    following_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.user} stats'
+
+
+class TrendingScore(models.Model):
+    """Time-decayed score of a recent post, kept by ``posts.trending``."""
+    post = models.OneToOneField(Post, on_delete=models.CASCADE,
+                                primary_key=True, related_name='trending')
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('score', 'post'),
+                         name='trending_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post} trending score'
+
+
+class Recommendation(models.Model):
+    """Authors to follow, precomputed by ``manage.py recommend_authors``.
+
+    ``authors`` is a list of ``{"id", "username", "mutual"}``, best first;
+    ``mutual`` counts the followed authors who follow the candidate.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE,
+                                primary_key=True,
+                                related_name='recommendations')
+    authors = models.JSONField(default=list)
+    computed = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.user} recommendations'
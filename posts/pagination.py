@@ -0,0 +1,218 @@
+import base64
+import datetime
+import math
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+
+
+def encode_cursor(value, pk):
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    raw = f'{value}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, field=None):
+    """Return ``(value, pk)`` for a cursor token or ``None`` if it is broken.
+
+    ``field`` is the model field the value is parsed with.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value, pk = base64.urlsafe_b64decode(padded).decode().rsplit('|', 1)
+        if field is not None:
+            value = field.to_python(value)
+        return value, int(pk)
+    except (ValueError, UnicodeDecodeError, ValidationError):
+        return None
+
+
+class CursorPage(Page):
+    """Page of a keyset query.
+
+    Has no page number and never counts the rows, ``next_cursor`` and
+    ``previous_cursor`` take the place of page numbers in links.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        super().__init__(object_list, None, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self)} items>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def next_page_number(self):
+        return self.next_cursor
+
+    def previous_page_number(self):
+        return self.previous_cursor
+
+    def start_index(self):
+        return None
+
+    def end_index(self):
+        return None
+
+
+class CursorPaginator(Paginator):
+    """Keyset paginator over ``(field, tiebreak)``, newest first.
+
+    The queryset must be filterable by ``field`` and ``tiebreak``; the
+    ordering is replaced with ``-field, -tiebreak``, so an index on
+    ``field`` (or a composite one ending with it) serves every page without
+    an OFFSET scan. ``tiebreak`` is ``id`` unless the index holds another
+    column of the same value, like the post of a joined table. Rows of a
+    ``.values()`` queryset work as well when they include both columns.
+    """
+
+    def __init__(self, object_list, per_page, field='pub_date',
+                 tiebreak='id'):
+        super().__init__(
+            object_list.order_by(f'-{field}', f'-{tiebreak}'), per_page
+        )
+        self.field = field
+        self.tiebreak = tiebreak
+
+    def _key(self, obj):
+        if isinstance(obj, dict):
+            return obj[self.field], obj[self.tiebreak]
+        return getattr(obj, self.field), getattr(obj, self.tiebreak)
+
+    def _cursor(self, obj):
+        return encode_cursor(*self._key(obj))
+
+    def _decode(self, token):
+        query = self.object_list.query
+        if self.field in query.annotations:
+            field = query.annotations[self.field].output_field
+        else:
+            field = self.object_list.model._meta.get_field(self.field)
+        return decode_cursor(token, field)
+
+    def _older(self, queryset, value, pk):
+        # The redundant upper bound lets the index seek to the cursor.
+        return queryset.filter(
+            Q(**{f'{self.field}__lte': value}),
+            Q(**{f'{self.field}__lt': value})
+            | Q(**{self.field: value, f'{self.tiebreak}__lt': pk}),
+        )
+
+    def page_after(self, token=None):
+        """Return the page that follows ``token``, or the first one.
+
+        One row past the page is read to know whether a next one exists.
+        """
+        queryset = self.object_list.order_by(f'-{self.field}',
+                                             f'-{self.tiebreak}')
+        cursor = self._decode(token) if token else None
+        if cursor is not None:
+            queryset = self._older(queryset, *cursor)
+        rows = list(queryset[:self.per_page + 1])
+        items = rows[:self.per_page]
+        next_cursor = None
+        if len(rows) > self.per_page:
+            next_cursor = self._cursor(rows[self.per_page - 1])
+        previous_cursor = None
+        if cursor is not None and rows:
+            previous_cursor = self._cursor(rows[0])
+        return CursorPage(items, self, next_cursor, previous_cursor)
+
+    def page_before(self, token):
+        cursor = self._decode(token)
+        if cursor is None:
+            return self.page_after()
+        value, pk = cursor
+        queryset = self.object_list.order_by(
+            self.field, self.tiebreak
+        ).filter(
+            Q(**{f'{self.field}__gte': value}),
+            Q(**{f'{self.field}__gt': value})
+            | Q(**{self.field: value, f'{self.tiebreak}__gt': pk}),
+        )
+        rows = list(queryset[:self.per_page + 1])
+        items = rows[:self.per_page][::-1]
+        previous_cursor = None
+        if len(rows) > self.per_page:
+            previous_cursor = self._cursor(items[0])
+        next_cursor = self._cursor(items[-1]) if items else None
+        return CursorPage(items, self, next_cursor, previous_cursor)
+
+
+def paginate(request, queryset, per_page, field='pub_date', tiebreak='id',
+             count=None):
+    """Return ``(paginator, page)`` for a list view.
+
+    ``?after=``/``?before=`` switch to keyset pagination; otherwise the
+    usual numbered ``Paginator`` is used. A numbered page still gets a
+    ``next_cursor`` so "next" links lead into keyset mode and deep pages
+    never need an OFFSET. ``count``, a callable, replaces the COUNT query
+    of the numbered paginator; see ``counted_page``.
+    """
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if after or before:
+        paginator = CursorPaginator(queryset, per_page, field, tiebreak)
+        if before:
+            return paginator, paginator.page_before(before)
+        return paginator, paginator.page_after(after)
+
+    ordered = queryset.order_by(f'-{field}', f'-{tiebreak}')
+    paginator = Paginator(ordered, per_page)
+    number = page_number(request)
+    if count is not None and number is not None:
+        page = counted_page(paginator, number, count())
+    else:
+        page = paginator.get_page(request.GET.get('page'))
+    return paginator, with_next_cursor(page, field, tiebreak)
+
+
+def page_number(request):
+    """The ``?page=`` number, or ``None`` if it is not a positive integer."""
+    try:
+        number = int(request.GET.get('page', 1))
+    except ValueError:
+        return None
+    return number if number > 0 else None
+
+
+def counted_page(paginator, number, total, rows=None):
+    """Return page ``number`` of ``paginator`` without a COUNT query.
+
+    ``total``, a count that may be stale, only draws the links to the pages
+    past this one. The page reads one row past its end and the rows fix
+    the count up, so a stale total can neither cut the page short nor hide
+    the next one. ``rows`` are the rows of page ``number`` if they have
+    been read already. Past the end the last page by ``total`` is served,
+    or the first one if that is empty too.
+    """
+    per_page = paginator.per_page
+    last = max(1, math.ceil(total / per_page))
+    while True:
+        bottom = (number - 1) * per_page
+        if rows is None:
+            rows = list(paginator.object_list[bottom:bottom + per_page + 1])
+        if rows or number == 1:
+            break
+        number, rows = (last if number > last else 1), None
+    seen = bottom + len(rows)
+    paginator.count = max(total, seen) if len(rows) > per_page else seen
+    return Page(rows[:per_page], number, paginator)
+
+
+def with_next_cursor(page, field='pub_date', tiebreak='id'):
+    """Give a numbered ``page`` the cursor of the page that follows it."""
+    page.next_cursor = None
+    if page.has_next() and len(page):
+        last = page[len(page) - 1]
+        page.next_cursor = encode_cursor(getattr(last, field),
+                                         getattr(last, tiebreak))
+    return page
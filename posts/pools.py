@@ -0,0 +1,14 @@
+"""Process pools of the replay and recommendation commands."""
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import connections
+
+
+def process_pool(processes, **kwargs):
+    """A ``ProcessPoolExecutor`` that is safe to fork from a Django process.
+
+    Forked workers must not share the parent's database connections, so
+    they are closed first and every worker opens its own.
+    """
+    connections.close_all()
+    return ProcessPoolExecutor(processes, **kwargs)
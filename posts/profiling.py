@@ -0,0 +1,105 @@
+"""Sampled cProfile capture of requests.
+
+``ProfilingMiddleware`` profiles a ``PROFILE_SAMPLE_RATE`` share of the
+requests, and every request whose ``X-Profile`` header carries a token of
+``make_token`` (``manage.py profile_token``). Each profile is dumped in
+pstats format to ``PROFILE_DIR`` as ``<url name>.<timestamp>.<pid>.prof``;
+``manage.py profile_report`` merges the dumps and ranks the functions.
+
+Only the thread serving the request is profiled: the worker threads of
+``posts.async_views`` and the thumbnail workers are not.
+"""
+import cProfile
+import datetime
+import os
+import pstats
+import random
+import re
+
+from django.conf import settings
+from django.core import signing
+
+HEADER = 'HTTP_X_PROFILE'
+SALT = 'posts.profiling'
+MOMENT_FORMAT = '%Y%m%dT%H%M%S%f'
+DUMP_NAME = re.compile(
+    r'^(?P<name>[\w-]+)\.(?P<moment>\d{8}T\d{12})\.\d+\.prof$'
+)
+
+
+def make_token():
+    """Value of the ``X-Profile`` header, good for PROFILE_TOKEN_MAX_AGE."""
+    return signing.TimestampSigner(salt=SALT).sign('profile')
+
+
+def _valid(token):
+    try:
+        value = signing.TimestampSigner(salt=SALT).unsign(
+            token, max_age=settings.PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return value == 'profile'
+
+
+def wanted(request):
+    token = request.META.get(HEADER)
+    if token and _valid(token):
+        return True
+    rate = settings.PROFILE_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def start():
+    """Return a running profiler, or None if another one is active."""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    return profiler
+
+
+def save(profiler, url_name, moment):
+    """Dump ``profiler`` to PROFILE_DIR; return the path."""
+    name = re.sub(r'[^\w-]', '_', url_name or 'unresolved')
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    path = os.path.join(
+        settings.PROFILE_DIR,
+        f'{name}.{moment.strftime(MOMENT_FORMAT)}.{os.getpid()}.prof',
+    )
+    profiler.dump_stats(path)
+    return path
+
+
+def dumps(names=None, since=None, directory=None):
+    """``(url name, moment, path)`` of the dumps, oldest first.
+
+    ``names`` keeps the dumps of these URL names, ``since`` the ones taken
+    from that moment on.
+    """
+    directory = directory or settings.PROFILE_DIR
+    try:
+        files = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    found = []
+    for file in files:
+        match = DUMP_NAME.match(file)
+        if match is None:
+            continue
+        moment = datetime.datetime.strptime(match['moment'], MOMENT_FORMAT)
+        if names and match['name'] not in names:
+            continue
+        if since is not None and moment < since:
+            continue
+        found.append((match['name'], moment, os.path.join(directory, file)))
+    return sorted(found, key=lambda dump: dump[1])
+
+
+def merge(paths, stream=None):
+    """One ``pstats.Stats`` summing the dumps at ``paths``."""
+    stats = pstats.Stats(paths[0], stream=stream)
+    if len(paths) > 1:
+        stats.add(*paths[1:])
+    return stats
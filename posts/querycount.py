@@ -0,0 +1,102 @@
+"""Per-request query recording, N+1 detection and query budgets."""
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from .budgets import QUERY_BUDGETS
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:\?|%s)(?:, (?:\?|%s))*\)', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+# Only issued when the request runs inside an outer transaction, like the
+# one of a TestCase, so they are not counted against the budgets.
+_SAVEPOINT = re.compile(r'(?:RELEASE |ROLLBACK TO )?SAVEPOINT\b')
+_unrecorded = ContextVar('unrecorded', default=False)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def normalize_sql(sql):
+    """Reduce a query to its shape: literals and IN lists become ``?``."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+@contextmanager
+def unrecorded():
+    """Leave the queries of the block out of every ``QueryRecorder``.
+
+    For work done inline that normally runs off the request, like
+    thumbnails rendered with ``THUMBNAIL_WORKERS = 0``.
+    """
+    token = _unrecorded.set(True)
+    try:
+        yield
+    finally:
+        _unrecorded.reset(token)
+
+
+class QueryRecorder:
+    """Record every query run on any connection inside a ``with`` block."""
+
+    def __init__(self):
+        self.queries = []
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        if _unrecorded.get() or _SAVEPOINT.match(sql):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def __len__(self):
+        return len(self.queries)
+
+    @property
+    def shapes(self):
+        return Counter(normalize_sql(sql) for sql, duration in self.queries)
+
+    def repeated(self, limit=None):
+        """Query shapes run more than ``limit`` times, i.e. likely N+1."""
+        if limit is None:
+            limit = settings.QUERY_REPEAT_LIMIT
+        return {
+            shape: count for shape, count in self.shapes.items()
+            if count > limit
+        }
+
+
+def check_budget(url_name, recorder):
+    """Return the list of budget violations of one request."""
+    problems = []
+    budget = QUERY_BUDGETS.get(url_name)
+    if budget is not None and len(recorder) > budget:
+        problems.append(
+            f'{url_name}: {len(recorder)} queries, budget is {budget}'
+        )
+    for shape, count in recorder.repeated().items():
+        problems.append(f'{url_name}: N+1, {count} x {shape}')
+    return problems
@@ -0,0 +1,206 @@
+"""Who-to-follow recommendations, precomputed by ``recommend_authors``.
+
+The follow graph is loaded into CSR arrays over dense user indexes: the
+authors followed by user ``i`` are ``indices[indptr[i]:indptr[i + 1]]``.
+The candidates of a user are the authors followed by the authors they
+follow, ranked by how many of those lead to them (mutual follows), then
+by the posts they published in the last ``ACTIVE_DAYS`` days. Users with
+too few candidates are topped up with the most followed authors.
+
+Worker processes score ranges of users; the parent stores one
+``Recommendation`` row per user, which a view reads with one query.
+"""
+import datetime
+import heapq
+from array import array
+from collections import Counter
+from itertools import accumulate, repeat
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import generations
+from .models import Follow, Post, Recommendation, User
+from .pools import process_pool
+
+TOP = 5
+ACTIVE_DAYS = 30
+CHUNK_SIZE = 2000
+# Most followed authors kept to top up short lists.
+POPULAR = 100
+
+
+class Graph:
+    """Follow edges in CSR form, with the activity of every user."""
+
+    def __init__(self, ids, indptr, indices, activity, popular):
+        self.ids = ids
+        self.indptr = indptr
+        self.indices = indices
+        self.activity = activity
+        self.popular = popular
+
+    def __len__(self):
+        return len(self.ids)
+
+    def followed(self, index):
+        return self.indices[self.indptr[index]:self.indptr[index + 1]]
+
+
+def load_graph(users, active_days=ACTIVE_DAYS, chunk_size=CHUNK_SIZE):
+    """Build the graph over ``users``, primary keys in ascending order.
+
+    Follows and posts of users who signed up after ``users`` was read are
+    left out: they are picked up by the next run.
+    """
+    ids = array('q', users)
+    position = {pk: index for index, pk in enumerate(ids)}
+    degrees = array('q', bytes(8 * len(ids)))
+    indices = array('i')
+    edges = (Follow.objects.order_by('user_id', 'author_id')
+             .values_list('user_id', 'author_id').iterator(chunk_size))
+    for user_id, author_id in edges:
+        if user_id in position and author_id in position:
+            degrees[position[user_id]] += 1
+            indices.append(position[author_id])
+    indptr = array('q', accumulate(degrees, initial=0))
+
+    activity = array('i', bytes(4 * len(ids)))
+    since = timezone.now() - datetime.timedelta(days=active_days)
+    posts = (Post.objects.filter(pub_date__gte=since).order_by()
+             .values('author').annotate(total=Count('pk'))
+             .values_list('author', 'total'))
+    for author_id, total in posts:
+        if author_id in position:
+            activity[position[author_id]] = total
+
+    popular = array('i', (index for index, followers
+                          in Counter(indices).most_common(POPULAR)))
+    return Graph(ids, indptr, indices, activity, popular)
+
+
+def recommend(graph, index, top=TOP):
+    """``[(author index, mutual follows)]`` for user ``index``, best first."""
+    followed = graph.followed(index)
+    mutual = Counter()
+    for author in followed:
+        mutual.update(graph.followed(author))
+    excluded = set(followed)
+    excluded.add(index)
+    for author in excluded:
+        mutual.pop(author, None)
+    activity = graph.activity
+    best = heapq.nlargest(
+        top, mutual, key=lambda author: (mutual[author], activity[author],
+                                         -author)
+    )
+    ranked = [(author, mutual[author]) for author in best]
+    excluded.update(best)
+    for author in graph.popular:
+        if len(ranked) >= top:
+            break
+        if author not in excluded:
+            ranked.append((author, 0))
+    return ranked
+
+
+def score(graph, start, stop, top=TOP):
+    """``[(user pk, [(author pk, mutual)])]`` of indexes start to stop."""
+    ids = graph.ids
+    return [
+        (ids[index], [(ids[author], mutual)
+                      for author, mutual in recommend(graph, index, top)])
+        for index in range(start, stop)
+    ]
+
+
+_graph = None
+
+
+def _share(graph):
+    global _graph
+    _graph = graph
+
+
+def _score_chunk(start, stop, top):
+    return score(_graph, start, stop, top)
+
+
+def compute(graph, top=TOP, executor=None, chunk_size=CHUNK_SIZE):
+    """Yield the results of ``score`` chunk by chunk, in user order.
+
+    ``executor`` is a process pool started with ``workers(graph)``.
+    """
+    starts = range(0, len(graph), chunk_size)
+    stops = [min(start + chunk_size, len(graph)) for start in starts]
+    if executor is None:
+        for start, stop in zip(starts, stops):
+            yield score(graph, start, stop, top)
+    else:
+        yield from executor.map(_score_chunk, starts, stops, repeat(top))
+
+
+def workers(graph, processes):
+    """A process pool sharing ``graph``, forked before any transaction."""
+    return process_pool(processes, initializer=_share, initargs=(graph,))
+
+
+def store(chunks, usernames):
+    """Replace all ``Recommendation`` rows; return how many were written.
+
+    ``chunks`` should be computed already: the rows are replaced in one
+    transaction, which holds the write lock of an SQLite database.
+    """
+    computed = timezone.now()
+    total = 0
+    with transaction.atomic():
+        Recommendation.objects.all().delete()
+        for chunk in chunks:
+            Recommendation.objects.bulk_create(
+                Recommendation(
+                    user_id=user_id, computed=computed,
+                    authors=[{'id': author_id,
+                              'username': usernames[author_id],
+                              'mutual': mutual}
+                             for author_id, mutual in authors],
+                )
+                for user_id, authors in chunk if authors
+            )
+            total += len(chunk)
+    generations.bump('recommendations', 0)
+    return total
+
+
+def rebuild(top=TOP, processes=1, active_days=ACTIVE_DAYS,
+            chunk_size=CHUNK_SIZE):
+    """Recompute the recommendations of every user; return the user count."""
+    users = dict(User.objects.order_by('pk').values_list('pk', 'username')
+                 .iterator(chunk_size))
+    graph = load_graph(users, active_days, chunk_size)
+    if processes <= 1:
+        chunks = list(compute(graph, top, None, chunk_size))
+    else:
+        with workers(graph, processes) as executor:
+            chunks = list(compute(graph, top, executor, chunk_size))
+    return store(chunks, users)
+
+
+def for_user(user, exclude=None):
+    """The stored recommendations of ``user``, minus the author ``exclude``."""
+    if not user.is_authenticated:
+        return []
+    authors = Recommendation.objects.filter(user=user).values_list(
+        'authors', flat=True
+    ).first() or []
+    return [author for author in authors if author['id'] != exclude]
+
+
+def discard(user_id, author_id):
+    """Drop ``author_id`` from the recommendations of a new follower."""
+    row = Recommendation.objects.filter(user_id=user_id).first()
+    if row is None:
+        return
+    authors = [author for author in row.authors if author['id'] != author_id]
+    if len(authors) < len(row.authors):
+        Recommendation.objects.filter(user_id=user_id).update(authors=authors)
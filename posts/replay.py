@@ -0,0 +1,335 @@
+"""Replay of access logs against the WSGI application.
+
+Log lines are parsed into ``Entry`` tuples, their paths are moved onto the
+users, posts and groups of the local database by ``PathMapper`` and
+``replay`` sends them to ``yatube.wsgi.application`` from a pool of
+threads or processes. ``replay_asgi`` sends them to
+``yatube.asgi.application`` from tasks of one event loop instead.
+"""
+import asyncio
+import datetime
+import io
+import json
+import re
+import sys
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from urllib.parse import quote, unquote, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY)
+from django.urls import Resolver404, resolve, reverse
+
+from .models import Group, Post, User
+from .pools import process_pool
+
+Entry = namedtuple('Entry', 'offset method path user')
+Request = namedtuple('Request', 'offset method path name cookie')
+Result = namedtuple('Result', 'name status milliseconds')
+
+CLF = re.compile(
+    r'^\S+ \S+ (?P<user>\S+) \[(?P<time>[^\]]+)\] '
+    r'"(?P<method>[A-Z]+) (?P<path>\S+)[^"]*"'
+)
+CLF_TIME = '%d/%b/%Y:%H:%M:%S %z'
+# Client address of replayed requests. Not an INTERNAL_IPS address, so the
+# debug toolbar stays out.
+REMOTE_ADDR = '192.0.2.1'
+
+
+def _timestamp(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.datetime.strptime(value, CLF_TIME).timestamp()
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def _parse_line(line):
+    """Return ``(time, method, path, user)`` of a log line or ``None``."""
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith('{'):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        path = record.get('path') or record.get('url')
+        if not path:
+            return None
+        moment = record.get('time', record.get('timestamp', 0))
+        return (_timestamp(moment), record.get('method', 'GET').upper(),
+                path, record.get('user') or None)
+    match = CLF.match(line)
+    if match is None:
+        return None
+    user = match['user'] if match['user'] != '-' else None
+    return _timestamp(match['time']), match['method'], match['path'], user
+
+
+def parse_log(lines):
+    """Parse common log format or JSON lines into ``Entry`` tuples.
+
+    Offsets are seconds since the first entry. Lines that are neither
+    format are dropped.
+    """
+    entries = []
+    start = None
+    for line in lines:
+        parsed = _parse_line(line)
+        if parsed is None:
+            continue
+        moment, method, path, user = parsed
+        if start is None:
+            start = moment
+        entries.append(Entry(max(moment - start, 0), method, path, user))
+    return entries
+
+
+def _pick(items, key):
+    """Stable choice: the same remote key always maps to the same item."""
+    return items[zlib.crc32(str(key).encode()) % len(items)]
+
+
+def session_cookie(user):
+    """``Cookie`` header value of a new session logged in as ``user``."""
+    engine = import_module(settings.SESSION_ENGINE)
+    session = engine.SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+
+
+class PathMapper:
+    """Move the usernames, post ids and group slugs of paths onto local rows.
+
+    A remote author becomes one of the local authors and their post ids
+    become posts of that author, so the pages keep resolving and a hot
+    post of the log stays hot locally.
+    """
+
+    def __init__(self):
+        self.authors = list(
+            User.objects.filter(posts__isnull=False).distinct()
+            .order_by('pk').values_list('pk', 'username')
+        )
+        self.users = list(User.objects.order_by('pk'))
+        self.groups = list(
+            Group.objects.order_by('pk').values_list('slug', flat=True)
+        )
+        self._posts = {}
+        self._cookies = {}
+
+    def posts(self, author_id):
+        if author_id not in self._posts:
+            self._posts[author_id] = list(
+                Post.objects.filter(author_id=author_id).order_by('pk')
+                .values_list('pk', flat=True)
+            )
+        return self._posts[author_id]
+
+    def map(self, path):
+        """Return ``(url name, local path)`` or ``None`` if it can't map."""
+        parts = urlsplit(path)
+        try:
+            match = resolve(parts.path)
+        except Resolver404:
+            return None
+        kwargs = dict(match.kwargs)
+        if 'username' in kwargs:
+            if not self.authors:
+                return None
+            author_id, kwargs['username'] = _pick(
+                self.authors, kwargs['username']
+            )
+            if 'post_id' in kwargs:
+                kwargs['post_id'] = _pick(
+                    self.posts(author_id), kwargs['post_id']
+                )
+        if 'slug' in kwargs and match.url_name == 'group':
+            if not self.groups:
+                return None
+            kwargs['slug'] = _pick(self.groups, kwargs['slug'])
+        local = reverse(match.view_name, args=match.args, kwargs=kwargs)
+        if parts.query:
+            local = f'{local}?{quote(parts.query, safe="=&%+")}'
+        return match.view_name, local
+
+    def cookie(self, remote_user):
+        """Session cookie of the local user standing in for ``remote_user``."""
+        if remote_user is None or not self.users:
+            return None
+        user = _pick(self.users, remote_user)
+        if user.pk not in self._cookies:
+            self._cookies[user.pk] = session_cookie(user)
+        return self._cookies[user.pk]
+
+    def requests(self, entries, methods):
+        """Map ``entries``; return the requests and the skip counts."""
+        requests = []
+        skipped = {'method': 0, 'unmapped': 0}
+        for entry in entries:
+            if entry.method not in methods:
+                skipped['method'] += 1
+                continue
+            mapped = self.map(entry.path)
+            if mapped is None:
+                skipped['unmapped'] += 1
+                continue
+            name, path = mapped
+            requests.append(Request(entry.offset, entry.method, path, name,
+                                    self.cookie(entry.user)))
+        return requests, skipped
+
+
+_application = None
+_asgi_application = None
+
+
+def _get_application():
+    global _application
+    if _application is None:
+        from yatube.wsgi import application
+        _application = application
+    return _application
+
+
+def _get_asgi_application():
+    global _asgi_application
+    if _asgi_application is None:
+        from yatube.asgi import application
+        _asgi_application = application
+    return _asgi_application
+
+
+def send(request):
+    """Run one request through the WSGI application and time it."""
+    path, _, query = request.path.partition('?')
+    environ = {
+        'REQUEST_METHOD': request.method,
+        # WSGI carries the unquoted path as latin-1 decoded bytes.
+        'PATH_INFO': unquote(path).encode().decode('latin-1'),
+        'QUERY_STRING': query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'REMOTE_ADDR': REMOTE_ADDR,
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if request.cookie:
+        environ['HTTP_COOKIE'] = request.cookie
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(int(status.split()[0]))
+
+    start = time.perf_counter()
+    try:
+        body = _get_application()(environ, start_response)
+        try:
+            for _ in body:
+                pass
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+        status = statuses[0]
+    except Exception:
+        status = 0
+    return Result(request.name, status, (time.perf_counter() - start) * 1000)
+
+
+def replay(requests, workers=4, processes=False, speed=0):
+    """Send ``requests`` from ``workers`` threads or processes.
+
+    With ``speed`` 0 they go out as fast as the pool takes them, otherwise
+    at their logged offsets divided by ``speed``. Returns the results and
+    the wall time in seconds.
+    """
+    if processes:
+        executor = process_pool(workers)
+    else:
+        executor = ThreadPoolExecutor(workers, thread_name_prefix='replay')
+    start = time.perf_counter()
+    with executor:
+        futures = []
+        for request in requests:
+            if speed:
+                delay = request.offset / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(executor.submit(send, request))
+        results = [future.result() for future in futures]
+    return results, time.perf_counter() - start
+
+
+async def send_asgi(request):
+    """Run one request through the ASGI application and time it."""
+    path, _, query = request.path.partition('?')
+    headers = [(b'host', b'localhost')]
+    if request.cookie:
+        headers.append((b'cookie', request.cookie.encode('latin-1')))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': request.method,
+        'scheme': 'http',
+        'path': unquote(path),
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': headers,
+        'client': (REMOTE_ADDR, 0),
+        'server': ('localhost', 80),
+    }
+    statuses = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    start = time.perf_counter()
+    try:
+        await _get_asgi_application()(scope, receive, send)
+        status = statuses[0]
+    except Exception:
+        status = 0
+    return Result(request.name, status, (time.perf_counter() - start) * 1000)
+
+
+def replay_asgi(requests, concurrency=4):
+    """Send ``requests`` as fast as possible, ``concurrency`` at a time.
+
+    Returns the results and the wall time in seconds, like ``replay``.
+    """
+    async def run():
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one(request):
+            async with slots:
+                return await send_asgi(request)
+
+        return await asyncio.gather(*(one(request) for request in requests))
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    return list(results), time.perf_counter() - start
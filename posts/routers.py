@@ -0,0 +1,114 @@
+"""Database router sending the reads of page views to a replica.
+
+Writes always go to ``default``. Reads of the ``posts`` models go to the
+``replica`` alias while a GET or HEAD request is served, unless:
+
+* the request already wrote, or runs in a transaction on the primary;
+* the user wrote less than ``REPLICA_PIN_SECONDS`` ago, so they see their
+  own post after the redirect: ``ReplicaPinMiddleware`` sets a cookie
+  after every request that wrote;
+* no separate replica is configured (tests mirror it onto ``default``).
+
+Code outside requests, like management commands, reads the primary.
+
+The replica lags behind the generation stamps, which are bumped on the
+write. Cards and ETags built from its rows also carry the ``replica``
+stamp, bumped once the replica caught up, so nothing stale outlives a
+sync in the cache.
+"""
+import contextvars
+import os
+import sqlite3
+
+from django.conf import settings
+from django.db import connections
+
+from . import generations
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+REPLICA_APPS = {'posts'}
+PIN_COOKIE = 'primary_pin'
+
+
+class _State:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('replica_state', default=None)
+
+
+def replica_configured():
+    """Whether ``replica`` is a database of its own and exists."""
+    if REPLICA not in settings.DATABASES:
+        return False
+    replica = connections[REPLICA]
+    name = replica.settings_dict['NAME']
+    if name == connections[PRIMARY].settings_dict['NAME']:
+        return False
+    # A local SQLite replica is created by the first ``sync_replica``.
+    return replica.vendor != 'sqlite' or os.path.exists(name)
+
+
+def reads_from_replica():
+    """Whether reads of the current request go to the replica."""
+    state = _state.get()
+    return (
+        state is not None
+        and state.use_replica
+        and not state.wrote
+        and not connections[PRIMARY].in_atomic_block
+        and replica_configured()
+    )
+
+
+def begin_request(request):
+    """Start routing the reads of ``request``; returns a reset token."""
+    use_replica = (request.method in ('GET', 'HEAD')
+                   and PIN_COOKIE not in request.COOKIES)
+    return _state.set(_State(use_replica))
+
+
+def end_request(token):
+    """Stop routing; return whether the request wrote to the primary."""
+    wrote = _state.get().wrote
+    _state.reset(token)
+    return wrote
+
+
+def sync_replica():
+    """Copy the SQLite primary onto the replica file.
+
+    Stands in for replication when both are local SQLite files.
+    """
+    primary = connections[PRIMARY]
+    primary.ensure_connection()
+    target = sqlite3.connect(connections[REPLICA].settings_dict['NAME'])
+    try:
+        primary.connection.backup(target)
+    finally:
+        target.close()
+    generations.bump('replica', 0)
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in REPLICA_APPS and reads_from_replica():
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets the schema with the data.
+        return db == PRIMARY
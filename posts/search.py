@@ -0,0 +1,143 @@
+"""Full-text search over posts and comments with SQLite FTS5.
+
+Both live in the ``posts_search`` table: a post is stored under rowid
+``2 * id`` and a comment under ``2 * id + 1``, each with the id of the
+post it belongs to. Model signals keep the table in sync; writes that
+bypass them (bulk imports) are followed by ``rebuild_search_index``.
+"""
+import re
+
+from django.db import connection
+
+from .models import Post
+
+TABLE = 'posts_search'
+POST = 0
+COMMENT = 1
+_WORD = re.compile(r'\w+')
+
+
+def available():
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """Turn user input into an FTS5 query that matches all of its words."""
+    return ' '.join(f'"{word}"' for word in _WORD.findall(query))
+
+
+def _write(rowid, text, post_id, created):
+    with connection.cursor() as cursor:
+        if not created:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [rowid])
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, text, post_id) VALUES (%s, %s, %s)',
+            [rowid, text, post_id],
+        )
+
+
+def _delete(rowid):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [rowid])
+
+
+def index_post(post, created=False):
+    if available():
+        _write(2 * post.pk + POST, post.text, post.pk, created)
+
+
+def unindex_post(post):
+    if available():
+        _delete(2 * post.pk + POST)
+
+
+def index_comment(comment, created=False):
+    if available():
+        _write(2 * comment.pk + COMMENT, comment.text, comment.post_id,
+               created)
+
+
+def unindex_comment(comment):
+    if available():
+        _delete(2 * comment.pk + COMMENT)
+
+
+def rebuild():
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, text, post_id) '
+            'SELECT 2 * id, text, id FROM posts_post'
+        )
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, text, post_id) '
+            'SELECT 2 * id + 1, text, post_id FROM posts_comment'
+        )
+
+
+def index_since(post_pk, comment_pk):
+    """Index the posts and comments with a primary key past these."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, text, post_id) '
+            'SELECT 2 * id, text, id FROM posts_post WHERE id > %s',
+            [post_pk],
+        )
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, text, post_id) '
+            'SELECT 2 * id + 1, text, post_id FROM posts_comment '
+            'WHERE id > %s',
+            [comment_pk],
+        )
+
+
+def ids_sql(kind):
+    """SQL selecting the ids of the posts or comments whose text matches."""
+    return f'SELECT rowid / 2 FROM {TABLE} WHERE {TABLE} MATCH %s ' \
+           f'AND rowid %% 2 = {kind}'
+
+
+class SearchResults:
+    """Posts matching a query, best first, sliced lazily for ``Paginator``.
+
+    A post matches through its own text or any of its comments and is
+    ranked by its best bm25 score.
+    """
+
+    def __init__(self, query):
+        self.expression = match_expression(query)
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = 0
+            if self.expression:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'SELECT COUNT(DISTINCT post_id) FROM {TABLE} '
+                        f'WHERE {TABLE} MATCH %s',
+                        [self.expression],
+                    )
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        limit = index.stop if index.stop is not None else self.count()
+        if not self.expression or limit <= start:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT post_id FROM (SELECT post_id, rank FROM {TABLE} '
+                f'WHERE {TABLE} MATCH %s) GROUP BY post_id '
+                'ORDER BY MIN(rank), post_id DESC LIMIT %s OFFSET %s',
+                [self.expression, limit - start, start],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = Post.objects.for_list().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
@@ -0,0 +1,109 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import (counters, generations, recommendations, search, timeline,
+               trending)
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+def bump_author_page(instance, field):
+    """Bump the stamp of the ``/<username>/`` pages of a related user."""
+    if getattr(type(instance), field).is_cached(instance):
+        username = getattr(instance, field).username
+    else:
+        username = User.objects.filter(
+            pk=getattr(instance, f'{field}_id')
+        ).values_list('username', flat=True).first()
+    if username is not None:
+        generations.bump('author', username)
+
+
+def follow_changed(follow):
+    generations.bump('feed', follow.user_id)
+    bump_author_page(follow, 'author')
+    bump_author_page(follow, 'user')
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    generations.bump('post', instance.pk)
+    generations.bump('index', 0)
+    bump_author_page(instance, 'author')
+    search.index_post(instance, created)
+    if created:
+        counters.bump_user(instance.author_id, posts_count=1)
+        counters.bump_total(1)
+        timeline.fan_out(instance)
+        trending.add_post(instance)
+    else:
+        timeline.refresh(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    generations.bump('post', instance.pk)
+    generations.bump('index', 0)
+    bump_author_page(instance, 'author')
+    counters.bump_user(instance.author_id, posts_count=-1)
+    counters.bump_total(-1)
+    search.unindex_post(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    search.index_comment(instance, created)
+    if created:
+        counters.bump_post(instance.post_id, 1)
+        trending.add_comment(instance)
+    generations.bump('post', instance.post_id)
+    generations.bump('index', 0)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.bump_post(instance.post_id, -1)
+    generations.bump('post', instance.post_id)
+    generations.bump('index', 0)
+    search.unindex_comment(instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_user(instance.author_id, followers_count=1)
+        counters.bump_user(instance.user_id, following_count=1)
+        timeline.backfill(instance.user_id, instance.author_id)
+        recommendations.discard(instance.user_id, instance.author_id)
+        follow_changed(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.bump_user(instance.author_id, followers_count=-1)
+    counters.bump_user(instance.user_id, following_count=-1)
+    timeline.prune(instance.user_id, instance.author_id)
+    follow_changed(instance)
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, raw=False, **kwargs):
+    # A new user has nothing to count: the stats row starts at zero.
+    if created and not raw:
+        AuthorStats.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    if kwargs.get('update_fields') == frozenset({'last_login'}):
+        return
+    generations.bump('user', instance.pk)
+    generations.bump('author', instance.username)
+    generations.bump('index', 0)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    generations.bump('group', instance.pk)
+    generations.bump('index', 0)
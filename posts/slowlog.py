@@ -0,0 +1,161 @@
+"""Log of the queries slower than ``SLOW_QUERY_MS``.
+
+An execute wrapper installed on every database connection times each
+query. A slow one is written as an NDJSON line to ``SLOW_QUERY_LOG``,
+rotated at ``SLOW_QUERY_LOG_MAX_BYTES``, with:
+
+* its shape (``querycount.normalize_sql``), SQL, parameters and duration;
+* the view of the request, named by ``SlowQueryMiddleware``;
+* the template line being rendered, like ``includes/post_item.html:29``,
+  and the innermost line of project code;
+* the plan of a SELECT, from ``EXPLAIN QUERY PLAN`` on SQLite.
+
+``manage.py slow_query_report`` ranks the shapes by total time.
+"""
+import contextvars
+import datetime
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.template.base import Node
+
+from . import querycount
+
+current_view = contextvars.ContextVar('slow_query_view', default=None)
+
+_PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Execute wrappers sit between the caller and the query.
+_SKIPPED = {os.path.abspath(__file__), os.path.abspath(querycount.__file__)}
+_lock = threading.Lock()
+_handler = None
+
+
+def _scalar(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _params(params, many):
+    if many or params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _scalar(value) for key, value in params.items()}
+    return [_scalar(value) for value in params]
+
+
+def _origin(frame):
+    """``(template line, code line)`` the query was run from."""
+    template = code = None
+    while frame is not None and (template is None or code is None):
+        node = frame.f_locals.get('self')
+        if (template is None and frame.f_code.co_name == 'render_annotated'
+                and isinstance(node, Node)):
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                template = f'{origin.template_name}:{token.lineno}'
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if (code is None and filename.startswith(_PROJECT + os.sep)
+                and filename not in _SKIPPED
+                and 'site-packages' not in filename):
+            code = (f'{os.path.relpath(filename, _PROJECT)}:'
+                    f'{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return template, code
+
+
+def explain(connection, sql, params):
+    """Plan lines of a SELECT, ``None`` for other statements."""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    prefix = ('EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite'
+              else 'EXPLAIN ')
+    # A cursor of its own: the caller has not read its rows yet.
+    cursor = connection.create_cursor()
+    try:
+        if params is None:
+            cursor.execute(prefix + sql)
+        else:
+            cursor.execute(prefix + sql, params)
+        return [str(row[-1]) for row in cursor.fetchall()]
+    except Exception as error:
+        return [f'EXPLAIN failed: {error}']
+    finally:
+        cursor.close()
+
+
+def _write(entry):
+    global _handler
+    path = os.path.abspath(settings.SLOW_QUERY_LOG)
+    with _lock:
+        if _handler is None or _handler.baseFilename != path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _handler = RotatingFileHandler(
+                path, maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+                encoding='utf-8',
+            )
+        handler = _handler
+    handler.handle(logging.makeLogRecord({
+        'msg': json.dumps(entry, ensure_ascii=False, default=str),
+    }))
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    threshold = settings.SLOW_QUERY_MS
+    if threshold is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = (time.perf_counter() - start) * 1000
+        if duration >= threshold:
+            connection = context['connection']
+            template, code = _origin(sys._getframe(1))
+            _write({
+                'time': datetime.datetime.now().isoformat(),
+                'db': connection.alias,
+                'duration_ms': round(duration, 3),
+                'shape': querycount.normalize_sql(sql),
+                'sql': sql,
+                'params': _params(params, many),
+                'view': current_view.get(),
+                'template': template,
+                'code': code,
+                'plan': None if many else explain(connection, sql, params),
+            })
+
+
+def install(sender, connection, **kwargs):
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_queries)
+
+
+connection_created.connect(install)
+
+
+def read(path=None):
+    """Yield the entries of the log, its rotated files first."""
+    path = path or settings.SLOW_QUERY_LOG
+    backups = [f'{path}.{number}' for number in
+               range(settings.SLOW_QUERY_LOG_BACKUPS, 0, -1)]
+    for name in backups + [path]:
+        try:
+            file = open(name, encoding='utf-8')
+        except FileNotFoundError:
+            continue
+        with file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
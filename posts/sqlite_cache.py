@@ -0,0 +1,273 @@
+"""Cache backend shared by every process of the host, in an SQLite file.
+
+``LocMemCache`` keeps one cache per worker process, so each of them
+renders the same fragments and generation stamps bumped in one worker are
+never seen by the others. This backend keeps the entries in an SQLite
+database in WAL mode: readers never block the writer, and all workers
+share the entries and the stamps.
+
+Integers are stored as SQL integers and everything else is pickled.
+``incr`` runs in one ``BEGIN IMMEDIATE`` transaction, so it is atomic
+across processes. Entries carry an approximate last access time: once the
+table grows past ``MAX_ENTRIES``, expired entries and then the least
+recently used ones are culled.
+
+    CACHES = {'default': {
+        'BACKEND': 'posts.sqlite_cache.SQLiteCache',
+        'LOCATION': '/var/tmp/yatube-cache.sqlite3',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    }}
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB,
+    expires REAL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+'''
+# SQLite binds at most 999 variables per statement on old builds.
+MAX_VARIABLES = 900
+
+
+def _chunks(items, size=MAX_VARIABLES):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class SQLiteCache(BaseCache):
+    """Django cache backend on an SQLite database in WAL mode.
+
+    ``OPTIONS`` besides the usual ``MAX_ENTRIES`` and ``CULL_FREQUENCY``:
+    ``CULL_CHECK_INTERVAL``, the number of writes of a process between two
+    checks of the table size, and ``ACCESS_RESOLUTION``, the seconds after
+    which a read refreshes the access time of an entry.
+    """
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = location
+        self._cull_interval = int(options.get('CULL_CHECK_INTERVAL', 100))
+        self._access_resolution = float(options.get('ACCESS_RESOLUTION', 60))
+        self._local = threading.local()
+        self._writes = 0
+
+    # Connections
+
+    def _connection(self):
+        """One connection per thread, reopened after a fork."""
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path, timeout=30, isolation_level=None,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+
+    def close(self, **kwargs):
+        # Connections are kept for the life of the thread: opening one
+        # costs more than most cache operations.
+        pass
+
+    # Values
+
+    def _encode(self, value):
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return value
+        return pickle.dumps(value, self.pickle_protocol)
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    # Reads
+
+    def _fetch(self, keys):
+        """``{key: raw value}`` of the live entries among ``keys``."""
+        now = time.time()
+        connection = self._connection()
+        found = {}
+        stale = []
+        for chunk in _chunks(keys):
+            rows = connection.execute(
+                'SELECT key, value, accessed FROM cache '
+                f'WHERE key IN ({", ".join("?" * len(chunk))}) '
+                'AND (expires IS NULL OR expires > ?)',
+                [*chunk, now],
+            ).fetchall()
+            for key, value, accessed in rows:
+                found[key] = value
+                if accessed < now - self._access_resolution:
+                    stale.append(key)
+        for chunk in _chunks(stale):
+            connection.execute(
+                'UPDATE cache SET accessed = ? '
+                f'WHERE key IN ({", ".join("?" * len(chunk))})',
+                [now, *chunk],
+            )
+        return found
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        found = self._fetch([key])
+        if key not in found:
+            return default
+        return self._decode(found[key])
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        return {
+            keys[key]: self._decode(value)
+            for key, value in self._fetch(list(keys)).items()
+        }
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return key in self._fetch([key])
+
+    # Writes
+
+    def _write(self, rows, mode='REPLACE'):
+        """Insert ``(key, value, expires)`` rows, return the count written."""
+        now = time.time()
+        connection = self._connection()
+        written = 0
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if mode == 'IGNORE':
+                # ``add`` may take over an expired entry.
+                connection.executemany(
+                    'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                    [(key, now) for key, value, expires in rows],
+                )
+            for key, value, expires in rows:
+                written += connection.execute(
+                    f'INSERT OR {mode} INTO cache '
+                    '(key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+                    (key, self._encode(value), expires, now),
+                ).rowcount
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self._writes += 1
+        if self._writes % self._cull_interval == 0:
+            self._cull()
+        return written
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._write([(self._key(key, version), value,
+                      self.get_backend_timeout(timeout))])
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        self._write([(self._key(key, version), value, expires)
+                     for key, value in data.items()])
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return bool(self._write(
+            [(self._key(key, version), value,
+              self.get_backend_timeout(timeout))],
+            mode='IGNORE',
+        ))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return bool(self._connection().execute(
+            'UPDATE cache SET expires = ? '
+            'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), self._key(key, version),
+             time.time()),
+        ).rowcount)
+
+    def incr(self, key, delta=1, version=None):
+        """Atomic for integer values, across threads and processes."""
+        key = self._key(key, version)
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT value FROM cache '
+                'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = self._decode(row[0]) + delta
+            connection.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (self._encode(value), key),
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return value
+
+    def delete(self, key, version=None):
+        return bool(self._connection().execute(
+            'DELETE FROM cache WHERE key = ?', (self._key(key, version),)
+        ).rowcount)
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        connection = self._connection()
+        for chunk in _chunks(keys):
+            marks = ', '.join('?' * len(chunk))
+            connection.execute(
+                f'DELETE FROM cache WHERE key IN ({marks})', chunk
+            )
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+
+    # Eviction
+
+    def _cull(self):
+        """Drop expired entries, then the least recently used ones.
+
+        Like the database cache, ``1 / CULL_FREQUENCY`` of the entries go
+        once the table is over ``MAX_ENTRIES``; ``CULL_FREQUENCY = 0``
+        empties it.
+        """
+        connection = self._connection()
+        connection.execute('DELETE FROM cache WHERE expires <= ?',
+                           (time.time(),))
+        count = connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        if not self._cull_frequency:
+            self.clear()
+            return
+        excess = count - self._max_entries + count // self._cull_frequency
+        connection.execute(
+            'DELETE FROM cache WHERE key IN '
+            '(SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+            (excess,),
+        )
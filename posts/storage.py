@@ -0,0 +1,76 @@
+import hashlib
+import os
+import time
+
+from django.core.files.storage import FileSystemStorage
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Store every file under the SHA-256 of its content.
+
+    ``posts/photo.jpg`` is saved as ``posts/ab/cd/abcd….jpg``, so a file
+    uploaded again is found on disk and never written twice.
+
+    As files are shared, ``delete`` leaves them in place; ``collect`` (the
+    ``collect_images`` command) removes the ones nothing refers to.
+    """
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        name = os.path.join(
+            directory, digest[:2], digest[2:4], digest + extension
+        )
+        if self.exists(name):
+            # A fresh mtime keeps the file from ``collect`` until the row
+            # that reuses it is saved.
+            os.utime(self.path(name))
+            return name
+        content.seek(0)
+        return super()._save(name, content)
+
+    def get_available_name(self, name, max_length=None):
+        # Names are picked in _save(), taken ones are reused, not renamed.
+        return name
+
+    def delete(self, name):
+        # Other rows may point to the same file.
+        pass
+
+    def _walk(self, directory):
+        directories, files = self.listdir(directory)
+        for filename in files:
+            yield os.path.join(directory, filename)
+        for subdirectory in directories:
+            yield from self._walk(os.path.join(directory, subdirectory))
+
+    def collect(self, directory, referenced, min_age=0, batch_size=500):
+        """Delete the files under ``directory`` that are no longer used.
+
+        ``referenced(names)`` returns the subset of ``names`` still in use.
+        Files written or reused less than ``min_age`` seconds ago are kept.
+        Returns the names of the deleted files.
+        """
+        if not self.exists(directory):
+            return []
+        deleted = []
+        names = self._walk(directory)
+        while True:
+            batch = [name for _, name in zip(range(batch_size), names)]
+            if not batch:
+                return deleted
+            used = referenced(batch)
+            for name in batch:
+                if name in used:
+                    continue
+                if time.time() - os.path.getmtime(self.path(name)) < min_age:
+                    continue
+                super().delete(name)
+                deleted.append(name)
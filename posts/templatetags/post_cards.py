@@ -0,0 +1,61 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from posts import generations, metrics, routers
+from posts.thumbnails import image_key
+
+register = template.Library()
+
+
+def card_keys(post, replica=False):
+    keys = [generations.key('post', post.pk),
+            generations.key('user', post.author_id)]
+    if post.group_id:
+        keys.append(generations.key('group', post.group_id))
+    if post.image:
+        keys.append(image_key(post.image.name))
+    if replica:
+        keys.append(generations.key('replica', 0))
+    return keys
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Render ``includes/post_item.html`` for every post, through the cache.
+
+    A card is keyed by the generation stamps of its post, author and group
+    and by whether the viewer is the author, so one ``get_many`` for the
+    stamps and one for the cards serve a page that has not changed.
+    """
+    posts = list(posts)
+    user = context.get('user')
+    replica = routers.reads_from_replica()
+    stamps = generations.get_many(
+        [name for post in posts for name in card_keys(post, replica)]
+    )
+    keys = {}
+    for post in posts:
+        is_author = user is not None and user.pk == post.author_id
+        versions = '.'.join(
+            str(stamps[name]) for name in card_keys(post, replica)
+        )
+        keys[post.pk] = f'post_card:{post.pk}:{versions}:{int(is_author)}'
+    cards = cache.get_many(list(keys.values()))
+    if posts:
+        metrics.inc('yatube_cache_requests_total', len(cards),
+                    fragment='post_card', result='hit')
+        metrics.inc('yatube_cache_requests_total', len(posts) - len(cards),
+                    fragment='post_card', result='miss')
+
+    missing = {}
+    item = context.template.engine.get_template('includes/post_item.html')
+    for post in posts:
+        if keys[post.pk] not in cards:
+            with context.push(post=post):
+                missing[keys[post.pk]] = item.render(context)
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_TIMEOUT)
+        cards.update(missing)
+    return mark_safe(''.join(cards[keys[post.pk]] for post in posts))
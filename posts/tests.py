@@ -1,15 +1,14 @@
 import os
 import tempfile
-import time
 
-from django.test import Client, TestCase
+from django.test import Client, TestCase, TransactionTestCase
 from django.urls import reverse
 from PIL import Image
 
 from posts.models import Group, Post, User
 
 
-class TestPosts(TestCase):
+class TestPosts(TransactionTestCase):
     def setUp(self):
         self.login_client = Client()
         self.logout_client = Client()
@@ -46,8 +45,6 @@ class TestPosts(TestCase):
         )
         self.assertEqual(response.status_code, 200)
 
-        time.sleep(20)
-
         response_index = self.login_client.get(reverse('index'))
         self.assertContains(response_index, 'Test post again')
 
@@ -68,8 +65,6 @@ class TestPosts(TestCase):
         self.post.text = 'Test post after update'
         self.post.save()
 
-        time.sleep(20)
-
         response_index = self.login_client.get(reverse('index'))
         self.assertContains(response_index, 'Test post after update')
 
@@ -104,8 +99,14 @@ class TestPosts(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
-class TestImages(TestCase):
+class TestImages(TransactionTestCase):
     def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = self.settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.media_root = media.name
         self.client = Client()
         self.user = User.objects.create_user(
             username='testimage',
@@ -127,8 +128,9 @@ class TestImages(TestCase):
         """Check adding image to post
         and if it appeared on index, profile, group and post pages"""
         img = Image.new('RGB', (60, 30), color='red')
-        img.save('media/pil_red.png')
-        with open('media/pil_red.png', 'rb') as img:
+        path = os.path.join(self.media_root, 'pil_red.png')
+        img.save(path)
+        with open(path, 'rb') as img:
             new_post_data = {
                 'text': 'Test post with image',
                 'author': self.user.username,
@@ -142,8 +144,6 @@ class TestImages(TestCase):
             )
             self.assertEqual(response.status_code, 302)
 
-        time.sleep(20)
-
         response_index = self.client.get(reverse('index'))
         self.assertContains(response_index, 'img')
 
@@ -160,9 +160,6 @@ class TestImages(TestCase):
         response_edit = self.client.get(reverse('post', kwargs=kwargs))
         self.assertContains(response_edit, 'img')
 
-        os.remove('media/pil_red.png')
-        os.remove('media/posts/pil_red.png')
-
     def test_wrong_file(self):
         with tempfile.TemporaryFile() as img:
             new_post_data = {
@@ -190,7 +187,7 @@ class TestCache(TestCase):
         )
 
     def test_cache(self):
-        """Check if cache work on index page"""
+        """Check that cached post cards on index page follow new posts"""
         first_post_data = {
             'text': 'Test post 1',
             'author': self.user.username,
@@ -208,10 +205,7 @@ class TestCache(TestCase):
 
         self.client.post(reverse('new_post'), second_post_data, follow=True)
         response_index2 = self.client.get(reverse('index'))
-        self.assertNotContains(response_index2, 'Test post 2')
-
-        time.sleep(20)
-        response_index2 = self.client.get(reverse('index'))
+        self.assertContains(response_index2, 'Test post 1')
         self.assertContains(response_index2, 'Test post 2')
 
 
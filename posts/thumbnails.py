@@ -0,0 +1,160 @@
+"""Thumbnails rendered off the request path.
+
+``DeferredThumbnailBackend`` is the sorl-thumbnail backend of the project.
+It only ever returns thumbnails that already exist; for a missing one it
+queues the work on a bounded thread pool and returns the original image
+meanwhile, sized from its row so the page keeps its layout. When a
+thumbnail is ready the ``image`` generation stamp of its source is bumped,
+so cached post cards pick it up on the next render.
+"""
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from . import generations, metrics, querycount
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_executor = None
+_pending = {}
+
+
+def _image_id(name):
+    return hashlib.md5(name.encode()).hexdigest()
+
+
+def image_key(name):
+    return generations.key('image', _image_id(name))
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+        return _executor
+
+
+class DeferredThumbnailBackend(ThumbnailBackend):
+
+    def _options(self, source, options):
+        """Fill in the defaults exactly like ``ThumbnailBackend`` does."""
+        options = dict(options)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        return options
+
+    def get_ready_thumbnail(self, file_, geometry_string, **options):
+        """Return the thumbnail if it was already generated, else ``None``."""
+        source = ImageFile(file_)
+        options = self._options(source, options)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        if not settings.THUMBNAIL_WORKERS:
+            metrics.inc('yatube_thumbnails_total', result='inline')
+            with querycount.unrecorded():
+                return super().get_thumbnail(file_, geometry_string,
+                                             **options)
+        thumbnail = self.get_ready_thumbnail(
+            file_, geometry_string, **options
+        )
+        if thumbnail is not None:
+            metrics.inc('yatube_thumbnails_total', result='ready')
+            return thumbnail
+        metrics.inc('yatube_thumbnails_total', result='queued')
+        self.queue(file_, geometry_string, options)
+        return original(file_)
+
+    def queue(self, file_, geometry_string, options):
+        """Generate a thumbnail on the pool, at most once at a time.
+
+        Jobs beyond ``THUMBNAIL_QUEUE_SIZE`` are dropped, the next render
+        of the image queues them again.
+        """
+        job = (file_.name, geometry_string, tuple(sorted(options.items())))
+        if not settings.THUMBNAIL_WORKERS:
+            with querycount.unrecorded():
+                return self._generate(file_, geometry_string, options)
+        with _lock:
+            if job in _pending:
+                return _pending[job]
+            if len(_pending) >= settings.THUMBNAIL_QUEUE_SIZE:
+                return None
+            _pending[job] = None
+        future = _get_executor().submit(
+            self._run, job, file_, geometry_string, options
+        )
+        with _lock:
+            if job in _pending:
+                _pending[job] = future
+        return future
+
+    def _generate(self, file_, geometry_string, options):
+        start = time.perf_counter()
+        try:
+            super().get_thumbnail(file_, geometry_string, **options)
+            generations.bump('image', _image_id(file_.name))
+        except Exception:
+            logger.exception('Thumbnail of %s failed', file_.name)
+        metrics.observe('yatube_thumbnail_render_seconds',
+                        time.perf_counter() - start)
+
+    def _run(self, job, file_, geometry_string, options):
+        try:
+            self._generate(file_, geometry_string, options)
+        finally:
+            with _lock:
+                _pending.pop(job, None)
+            connections.close_all()
+
+
+def original(file_):
+    """``file_`` as an image, with the size its model field keeps, if any."""
+    image = ImageFile(file_)
+    field = getattr(file_, 'field', None)
+    width_field = getattr(field, 'width_field', None)
+    height_field = getattr(field, 'height_field', None)
+    if width_field and height_field:
+        size = (getattr(file_.instance, width_field),
+                getattr(file_.instance, height_field))
+        if all(size):
+            image.set_size(size)
+    return image
+
+
+def pregenerate(image):
+    """Queue every geometry of ``THUMBNAIL_PREGENERATE`` for ``image``."""
+    return [
+        default.backend.queue(image, geometry, options)
+        for geometry, options in settings.THUMBNAIL_PREGENERATE
+    ]
+
+
+def wait():
+    """Block until the queued thumbnails are done."""
+    with _lock:
+        futures = [future for future in _pending.values() if future]
+    for future in futures:
+        future.result()
@@ -0,0 +1,150 @@
+"""Materialized follow feed.
+
+Every non-prolific author's post is copied into the timelines of the
+author's followers when it is saved (fan-out on write). Authors with more
+than ``TIMELINE_FANOUT_LIMIT`` followers are skipped there and their posts
+are pulled at read time instead, so one post never turns into millions of
+inserts.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef, Q, Subquery
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+
+PROLIFIC_AUTHORS_KEY = 'timeline:prolific_authors'
+PROLIFIC_AUTHORS_TIMEOUT = 300
+BATCH_SIZE = 500
+
+
+def prolific_authors():
+    authors = cache.get(PROLIFIC_AUTHORS_KEY)
+    if authors is None:
+        authors = set(AuthorStats.objects.filter(
+            followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+        ).values_list('user_id', flat=True))
+        cache.set(PROLIFIC_AUTHORS_KEY, authors, PROLIFIC_AUTHORS_TIMEOUT)
+    return authors
+
+
+def is_prolific(author_id):
+    return author_id in prolific_authors()
+
+
+def trim(users):
+    """Keep only the newest ``TIMELINE_LENGTH`` entries of the timelines.
+
+    ``users`` are ids or a queryset of them; all the timelines are trimmed
+    by one DELETE.
+    """
+    length = settings.TIMELINE_LENGTH
+    cutoff = (
+        TimelineEntry.objects.filter(user_id=OuterRef('user_id'))
+        .order_by('-pub_date')
+        .values('pub_date')[length:length + 1]
+    )
+    TimelineEntry.objects.filter(
+        user_id__in=users, pub_date__lte=Subquery(cutoff)
+    ).delete()
+
+
+def fan_out(post):
+    if is_prolific(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    entries = [
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    ]
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+    if post.pk % settings.TIMELINE_TRIM_INTERVAL == 0:
+        trim(followers)
+
+
+def refresh(post):
+    """Move an edited post to its new place in the timelines."""
+    TimelineEntry.objects.filter(post=post).update(pub_date=post.pub_date)
+
+
+def backfill(user_id, author_id):
+    if is_prolific(author_id):
+        return
+    posts = (
+        Post.objects.filter(author_id=author_id)
+        .order_by('-pub_date', '-id')
+        .values_list('id', 'pub_date')[:settings.TIMELINE_LENGTH]
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    trim([user_id])
+
+
+def prune(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def rebuild():
+    """Refill every timeline from the follow graph, one author at a time.
+
+    For writes that bypass the signals, like ``generate_dataset``.
+    """
+    cache.delete(PROLIFIC_AUTHORS_KEY)
+    TimelineEntry.objects.all().delete()
+    fill(Follow.objects.values('author_id'))
+    trim(Follow.objects.values('user_id'))
+
+
+def fill(authors):
+    """Copy the newest posts of ``authors`` into their followers' timelines.
+
+    ``authors`` are ids or a queryset of them. Entries already there are
+    kept; the timelines are left for ``trim``.
+    """
+    pulled = prolific_authors()
+    authors = Follow.objects.filter(author__in=authors).exclude(
+        author__in=pulled
+    ).order_by('author_id').values_list('author_id', flat=True).distinct()
+    for author_id in authors.iterator():
+        posts = list(
+            Post.objects.filter(author_id=author_id)
+            .order_by('-pub_date', '-id')
+            .values_list('id', 'pub_date')[:settings.TIMELINE_LENGTH]
+        )
+        followers = Follow.objects.filter(
+            author_id=author_id
+        ).values_list('user_id', flat=True)
+        for user_id in followers.iterator():
+            TimelineEntry.objects.bulk_create(
+                [
+                    TimelineEntry(user_id=user_id, post_id=post_id,
+                                  pub_date=pub_date)
+                    for post_id, pub_date in posts
+                ],
+                batch_size=BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+
+
+def feed(user):
+    """Posts of the authors ``user`` follows, newest first."""
+    condition = Q(id__in=TimelineEntry.objects.filter(
+        user=user
+    ).values('post_id'))
+    pulled = prolific_authors()
+    if pulled:
+        condition |= Q(author__in=Follow.objects.filter(
+            user=user, author__in=pulled
+        ).values('author'))
+    return Post.objects.filter(condition)
@@ -0,0 +1,130 @@
+"""Trending posts: recent posts ranked by a time-decayed score.
+
+A post earns the reach of its author when it is published and a point
+per comment, each halving every ``TRENDING_HALF_LIFE`` seconds. The score
+is stored in log space against a fixed origin::
+
+    score = ln(sum(weight * 2 ** (t / TRENDING_HALF_LIFE)))
+
+with ``t`` the Unix time of each event. That is the log of the decayed
+value times ``2 ** (now / TRENDING_HALF_LIFE)``, the same factor for every
+post: the order never changes by itself, so the index on the score serves
+the page, stored scores never need rescaling and an event is one
+``logaddexp`` on its row.
+
+The signals add events as they happen. ``manage.py refresh_trending``
+drops the posts older than ``TRENDING_WINDOW`` and recomputes the others,
+which picks up deleted comments and follower counts that have moved.
+"""
+import datetime
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import generations
+from .models import AuthorStats, Comment, Post, TrendingScore
+
+COMMENT_WEIGHT = 1.0
+# Weight of a post per unit of log(1 + followers of its author).
+FOLLOWER_WEIGHT = 1.0
+BATCH_SIZE = 500
+
+
+def _exponent(moment):
+    return moment.timestamp() * math.log(2) / settings.TRENDING_HALF_LIFE
+
+
+def _logaddexp(first, second):
+    high, low = max(first, second), min(first, second)
+    return high + math.log1p(math.exp(low - high))
+
+
+def post_weight(followers):
+    return 1 + FOLLOWER_WEIGHT * math.log1p(followers)
+
+
+def event(weight, moment):
+    """Log score of an event of ``weight`` that happened at ``moment``."""
+    return math.log(weight) + _exponent(moment)
+
+
+def decayed(score, now=None):
+    """The value ``score`` has decayed to at ``now``."""
+    return math.exp(score - _exponent(now or timezone.now()))
+
+
+def add_post(post):
+    followers = AuthorStats.objects.filter(
+        user_id=post.author_id
+    ).values_list('followers_count', flat=True).first() or 0
+    TrendingScore.objects.create(
+        post=post, score=event(post_weight(followers), post.pub_date)
+    )
+    generations.bump('trending', 0)
+
+
+def add_comment(comment):
+    """Add ``comment`` to the score of its post, if that one is trending."""
+    with transaction.atomic(savepoint=False):
+        row = TrendingScore.objects.select_for_update().filter(
+            post_id=comment.post_id
+        ).first()
+        if row is None:
+            return
+        row.score = _logaddexp(row.score,
+                               event(COMMENT_WEIGHT, comment.created))
+        row.save(update_fields=['score'])
+    generations.bump('trending', 0)
+
+
+def rebuild(now=None, posts=None):
+    """Recompute the scores of the posts of the last ``TRENDING_WINDOW``.
+
+    ``posts``, ids or a queryset of them, limits the pass to those posts.
+    Returns how many of the posts are trending.
+    """
+    since = (now or timezone.now()) - datetime.timedelta(
+        seconds=settings.TRENDING_WINDOW
+    )
+    rows = TrendingScore.objects.all()
+    recent = Post.objects.filter(pub_date__gte=since)
+    if posts is not None:
+        rows = rows.filter(post__in=posts)
+        recent = recent.filter(pk__in=posts)
+    with transaction.atomic():
+        # Deleting first takes the write lock: no comment slips in between.
+        rows.delete()
+        posts = recent.values_list(
+            'id', 'pub_date', 'author__stats__followers_count'
+        )
+        scores = {
+            pk: event(post_weight(followers or 0), pub_date)
+            for pk, pub_date, followers in posts.iterator()
+        }
+        comments = Comment.objects.filter(
+            post__in=recent
+        ).values_list('post_id', 'created')
+        for post_id, created in comments.iterator():
+            scores[post_id] = _logaddexp(scores[post_id],
+                                         event(COMMENT_WEIGHT, created))
+        TrendingScore.objects.bulk_create(
+            [TrendingScore(post_id=pk, score=score)
+             for pk, score in scores.items()],
+            batch_size=BATCH_SIZE,
+        )
+    generations.bump('trending', 0)
+    return len(scores)
+
+
+def ranked():
+    """Trending posts, to paginate on ``(trending_score, trending_id)``.
+
+    Both columns come from the score table, so its index gives the order.
+    """
+    return Post.objects.for_list().filter(trending__isnull=False).annotate(
+        trending_score=F('trending__score'),
+        trending_id=F('trending__post_id'),
+    )
@@ -8,13 +8,19 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group'),
     path('new/', views.new_post, name='new_post'),
+    path('search/', views.search, name='search'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('trending/', views.trending, name='trending'),
+    path('export/<str:table>/', views.export_table, name='export'),
+    path('metrics', views.prometheus_metrics, name='metrics'),
     path("<str:username>/follow/", views.profile_follow,
          name='profile_follow'),
     path("<str:username>/unfollow/", views.profile_unfollow,
          name='profile_unfollow'),
     path('<str:username>/', views.profile, name='profile'),
     path('<str:username>/<int:post_id>/', views.post_view, name='post'),
+    path('<str:username>/<int:post_id>/comments/', views.post_comments,
+         name='post_comments'),
     path('<str:username>/<int:post_id>/edit/', views.post_edit,
          name='post_edit'),
     path('<username>/<int:post_id>/comment/', views.add_comment,
@@ -1,21 +1,33 @@
 import datetime
+import hmac
 
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import (Http404, HttpResponse, HttpResponseBadRequest,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import etag
 
+from . import export, metrics, recommendations
+from .counters import author_stats, total_posts
+from .etags import (follow_etag, group_etag, index_etag, post_etag,
+                    profile_etag, trending_etag)
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import Follow, Group, Post, TrendingScore, User
+from .pagination import CursorPaginator, paginate
+from .search import SearchResults, available
+from .thumbnails import pregenerate
+from .timeline import feed
+from .trending import ranked
 
 
+@etag(index_etag)
 def index(request):
-    post_list = (
-        Post.objects.select_related('group').
-        order_by('-pub_date').all()
-    )
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = Post.objects.for_list()
+    paginator, page = paginate(request, post_list, 10, count=total_posts)
     context = {
         'page': page,
         'paginator': paginator
@@ -23,12 +35,23 @@ def index(request):
     return render(request, 'index.html', context)
 
 
+@etag(trending_etag)
+def trending(request):
+    paginator, page = paginate(request, ranked(), 10,
+                               field='trending_score', tiebreak='trending_id',
+                               count=TrendingScore.objects.count)
+    context = {
+        'page': page,
+        'paginator': paginator
+    }
+    return render(request, 'trending.html', context)
+
+
+@etag(group_etag)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    posts = group.posts.for_list()
+    paginator, page = paginate(request, posts, 10)
     context = {
         'group': group,
         'page': page,
@@ -37,7 +60,25 @@ def group_posts(request, slug):
     return render(request, 'group.html', context)
 
 
+@etag(index_etag)
+def search(request):
+    query = request.GET.get('q', '').strip()
+    if available():
+        results = SearchResults(query)
+    else:
+        results = Post.objects.for_list().filter(text__icontains=query)
+    paginator = Paginator(results, 10)
+    page = paginator.get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page': page,
+        'paginator': paginator
+    }
+    return render(request, 'search.html', context)
+
+
 @login_required
+@transaction.atomic
 def new_post(request):
     if request.method == 'POST':
         form = PostForm(request.POST or None, files=request.FILES or None)
@@ -45,22 +86,21 @@ def new_post(request):
             post = form.save(commit=False)
             post.author = request.user
             post.save()
+            if post.image:
+                transaction.on_commit(lambda: pregenerate(post.image))
             return redirect('index')
     else:
         form = PostForm()
     return render(request, 'new.html', {'form': form})
 
 
+@etag(profile_etag)
 def profile(request, username):
     user = get_object_or_404(User, username=username)
     fullname = user.get_full_name()
-    posts_count = user.posts.filter(author=user).count()
-    post_list = user.posts.filter(author=user)
-    paginator = Paginator(post_list, 3)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    followers = Follow.objects.filter(author=user).count()
-    following = Follow.objects.filter(user=user).count()
+    stats = author_stats(user)
+    post_list = user.posts.for_list()
+    paginator, page = paginate(request, post_list, 3)
 
     if request.user.is_authenticated:
         created = Follow.objects.filter(user=request.user, author=user).exists()
@@ -70,51 +110,83 @@ def profile(request, username):
     context = {
         'username': user,
         'fullname': fullname,
-        'posts_count': posts_count,
+        'posts_count': stats.posts_count,
         'page': page,
         'paginator': paginator,
-        'followers': followers,
-        'following': following,
+        'followers': stats.followers_count,
+        'following': stats.following_count,
         'created': created,
+        'recommendations': recommendations.for_user(request.user,
+                                                    exclude=user.pk),
     }
     return render(request, 'profile.html', context)
 
 
+@etag(post_etag)
 def post_view(request, username, post_id):
     user = get_object_or_404(User, username=username)
     fullname = user.get_full_name()
-    post = get_object_or_404(Post, id=post_id)
-    posts_count = user.posts.filter(author=user).count()
-    items = post.comments.order_by('-created').filter(post=post)
-    followers = Follow.objects.filter(author=user).count()
-    following = Follow.objects.filter(user=user).count()
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), id=post_id
+    )
+    stats = author_stats(user)
+    comments = comments_page(request, post)
     form = CommentForm()
     context = {
         'username': user,
         'fullname': fullname,
-        'posts_count': posts_count,
+        'posts_count': stats.posts_count,
         'post': post,
         'form': form,
-        'items': items,
-        'followers': followers,
-        'following': following,
+        'items': comments.paginator.object_list,
+        'comments': comments,
+        'followers': stats.followers_count,
+        'following': stats.following_count,
     }
     return render(request, 'post.html', context)
 
 
+def comments_page(request, post):
+    paginator = CursorPaginator(
+        post.comments.select_related('author'),
+        settings.COMMENTS_PER_PAGE,
+        'created',
+    )
+    return paginator.page_after(request.GET.get('after'))
+
+
+@etag(post_etag)
+def post_comments(request, username, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author'),
+        id=post_id,
+        author__username=username,
+    )
+    context = {
+        'post': post,
+        'comments': comments_page(request, post),
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
 @login_required
+@transaction.atomic
 def post_edit(request, username, post_id):
     user = get_object_or_404(User, username=username)
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.select_related('author'),
+                             id=post_id)
     if post.author == request.user:
         if request.method == 'POST':
-            form = PostForm(request.POST or None, files=request.FILES or None)
+            form = PostForm(request.POST or None, files=request.FILES or None,
+                            instance=post)
             if form.is_valid():
                 post = form.save(commit=False)
-                post.author = user
-                post.id = post_id
                 post.pub_date = datetime.datetime.now()
-                post.save()
+                post.save(update_fields=PostForm.Meta.fields + (
+                    'image_width', 'image_height', 'image_size', 'pub_date',
+                ))
+                if post.image:
+                    transaction.on_commit(lambda: pregenerate(post.image))
                 return redirect('post', username=user, post_id=post_id)
         else:
             form = PostForm(initial={'text': post.text, 'group': post.group})
@@ -124,6 +196,7 @@ def post_edit(request, username, post_id):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, username, post_id):
     user = get_object_or_404(User, username=username)
     post = get_object_or_404(Post, id=post_id)
@@ -133,7 +206,7 @@ def add_comment(request, username, post_id):
         if form.is_valid():
             comment = form.save(commit=False)
             comment.post = post
-            comment.author = get_object_or_404(User, username=request.user)
+            comment.author = request.user
             comment.save()
             return redirect('post', username=user, post_id=post_id)
 
@@ -141,19 +214,20 @@ def add_comment(request, username, post_id):
 
 
 @login_required
+@etag(follow_etag)
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = feed(request.user).for_list()
+    paginator, page = paginate(request, post_list, 10)
     context = {
         'page': page,
-        'paginator': paginator
+        'paginator': paginator,
+        'recommendations': recommendations.for_user(request.user),
     }
     return render(request, 'follow.html', context)
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     user = get_object_or_404(User, username=username)
     if user != request.user:
@@ -162,6 +236,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     user = get_object_or_404(User, username=username)
     Follow.objects.filter(user=request.user, author=user).delete()
@@ -169,6 +244,42 @@ def profile_unfollow(request, username):
     return redirect('profile', username=user)
 
 
+@staff_member_required
+def export_table(request, table):
+    """Stream a table dump, ``?format=csv|ndjson`` and ``?since=``."""
+    if table not in export.TABLES:
+        raise Http404
+    format = request.GET.get('format', 'ndjson')
+    if format not in export.FORMATS:
+        return HttpResponseBadRequest('Unknown format')
+    since = None
+    if request.GET.get('since'):
+        since = export.parse_moment(request.GET['since'])
+        if since is None:
+            return HttpResponseBadRequest('Bad since')
+    response = StreamingHttpResponse(
+        export.lines(table, format, since),
+        content_type=export.FORMATS[format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{table}.{format}"'
+    )
+    return response
+
+
+def prometheus_metrics(request):
+    """``posts.metrics`` of all processes, for holders of METRICS_TOKEN."""
+    token = settings.METRICS_TOKEN
+    given = request.META.get('HTTP_AUTHORIZATION', '')
+    if not token or not hmac.compare_digest(given.encode(),
+                                            f'Bearer {token}'.encode()):
+        raise Http404
+    return HttpResponse(
+        metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
 def page_not_found(request, exception):
 
     return render(
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budget(settings):
+    """Fail every test whose requests go over their query budget."""
+    settings.QUERY_BUDGET_STRICT = True
@@ -0,0 +1,26 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+
+def pytest_configure(config):
+    """Run the tests on a cache of their own: ``clear_cache`` empties it."""
+    from django.conf import settings
+    config.cache_dir = tempfile.mkdtemp(prefix='yatube-test-cache-')
+    settings.CACHES['default']['LOCATION'] = os.path.join(
+        config.cache_dir, 'default.sqlite3'
+    )
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(getattr(config, 'cache_dir', ''), ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
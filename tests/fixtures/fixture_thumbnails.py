@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def inline_thumbnails(settings):
+    """Render thumbnails in the test thread unless a test asks otherwise."""
+    settings.THUMBNAIL_WORKERS = 0
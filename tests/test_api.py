@@ -0,0 +1,105 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment, Follow, Post
+
+
+class TestApi:
+
+    @pytest.fixture
+    def strict(self, settings):
+        settings.QUERY_BUDGET_STRICT = True
+
+    @pytest.fixture
+    def posts(self, user, group):
+        return [Post.objects.create(text=f'Пост {i}', author=user, group=group) for i in range(5)]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_cursor_pages(self, client, strict, posts):
+        response = client.get('/api/v1/posts/?limit=3')
+        assert response.status_code == 200
+        data = response.json()
+        assert [row['id'] for row in data['results']] == [post.id for post in posts[:-4:-1]], \
+            'Проверьте, что `/api/v1/posts/` отдаёт новые посты первыми'
+        assert data['next'], 'Проверьте, что у списка постов есть курсор на следующую страницу'
+        assert data['results'][0]['author'] == posts[0].author.username
+
+        data = client.get(f'/api/v1/posts/?limit=3&after={data["next"]}').json()
+        assert [row['id'] for row in data['results']] == [posts[1].id, posts[0].id]
+        assert data['next'] is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_sparse_fields(self, client, posts):
+        data = client.get('/api/v1/posts/?fields=id,text').json()
+        assert set(data['results'][0]) == {'id', 'text'}, \
+            'Проверьте, что `?fields=` оставляет только перечисленные поля'
+        response = client.get('/api/v1/posts/?fields=id,password')
+        assert response.status_code == 400
+        assert 'password' in response.json()['detail']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_filters_and_detail(self, client, user, group, posts):
+        other = get_user_model().objects.create_user(username='Other')
+        Post.objects.create(text='Чужой пост', author=other)
+        data = client.get(f'/api/v1/posts/?author={user.username}').json()
+        assert len(data['results']) == 5
+        data = client.get(f'/api/v1/posts/?group={group.slug}').json()
+        assert len(data['results']) == 5
+
+        data = client.get(f'/api/v1/posts/{posts[0].id}/').json()
+        assert data['text'] == posts[0].text
+        assert data['group'] == group.slug
+        assert data['image'] is None
+        assert client.get('/api/v1/posts/999999/').status_code == 404
+        assert client.get(f'/api/v1/groups/{group.slug}/').json()['title'] == group.title
+
+    @pytest.mark.django_db(transaction=True)
+    def test_batch_one_query(self, client, posts):
+        ids = [posts[3].id, 999999, posts[0].id]
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'/api/v1/posts/batch/?ids={",".join(map(str, ids))}')
+        data = response.json()
+        assert [row['id'] for row in data['results']] == [posts[3].id, posts[0].id], \
+            'Проверьте, что пакетный запрос сохраняет порядок id'
+        assert data['missing'] == [999999]
+        post_queries = [query for query in context.captured_queries if 'posts_post' in query['sql']]
+        assert len(post_queries) == 1, 'Проверьте, что пакетный запрос читает посты одним запросом'
+        assert client.get('/api/v1/posts/batch/?ids=1,x').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_and_follows(self, client, strict, user, post):
+        reader = get_user_model().objects.create_user(username='Reader')
+        for i in range(3):
+            Comment.objects.create(post=post, author=reader, text=f'Комментарий {i}')
+        Follow.objects.create(user=reader, author=user)
+
+        data = client.get(f'/api/v1/posts/{post.id}/comments/?limit=2').json()
+        assert [row['text'] for row in data['results']] == ['Комментарий 2', 'Комментарий 1']
+        assert data['next']
+
+        data = client.get(f'/api/v1/follows/?author={user.username}').json()
+        assert data['results'] == [
+            {'id': Follow.objects.get().id, 'user': 'Reader', 'author': user.username}
+        ]
+        assert client.get('/api/v1/follows/').status_code == 400
+        assert client.get('/api/v1/groups/').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_etag(self, client, user, posts):
+        response = client.get('/api/v1/posts/')
+        assert response.has_header('ETag')
+        response = client.get('/api/v1/posts/', HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == 304
+
+        etag = client.get(f'/api/v1/follows/?user={user.username}')['ETag']
+        author = get_user_model().objects.create_user(username='Author')
+        Follow.objects.create(user=user, author=author)
+        response = client.get(f'/api/v1/follows/?user={user.username}', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, \
+            'Проверьте, что подписка меняет ETag списка подписок'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_read_only(self, client, posts):
+        assert client.post('/api/v1/posts/').status_code == 405
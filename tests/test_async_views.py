@@ -0,0 +1,101 @@
+import asyncio
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+from posts.models import Comment, Follow, Post
+from posts.replay import Request, send_asgi, session_cookie
+
+
+@pytest.fixture
+def pages(user, post_with_group, django_user_model):
+    reader = django_user_model.objects.create_user(username='Reader')
+    Follow.objects.create(user=reader, author=user)
+    Comment.objects.create(post=post_with_group, author=reader, text='Коммент')
+    for i in range(12):
+        Post.objects.create(text=f'Пост {i}', author=user)
+    paths = {
+        'index': '/',
+        'group': f'/group/{post_with_group.group.slug}/',
+        'profile': f'/{user.username}/',
+        'post': f'/{user.username}/{post_with_group.id}/',
+        'follow_index': '/follow/',
+    }
+    return paths, reader
+
+
+def snapshot(client, path):
+    """What a page shows, without the parts that differ per request."""
+    response = client.get(path)
+    context = response.context or {}
+    shown = {'status': response.status_code}
+    if 'page' in context:
+        shown['posts'] = [post.pk for post in context['page']]
+        shown['next'] = context['page'].next_page_number() \
+            if context['page'].has_next() else None
+    for name in ('posts_count', 'followers', 'following', 'created'):
+        if name in context:
+            shown[name] = context[name]
+    if 'items' in context:
+        shown['comments'] = [comment.pk for comment in context['items']]
+    return shown
+
+
+class TestAsyncViews:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_same_pages(self, pages, settings):
+        paths, reader = pages
+        client = Client()
+        client.force_login(reader)
+        urls = [path + query for path in paths.values()
+                for query in ('', '?page=2', '?page=99', '?page=x')]
+        expected = {url: snapshot(client, url) for url in urls}
+
+        settings.ROOT_URLCONF = 'yatube.asgi_urls'
+        for path in paths.values():
+            assert asyncio.iscoroutinefunction(client.get(path).resolver_match.func), \
+                f'Проверьте, что `{path}` в yatube.asgi_urls ведёт на async-представление'
+        for url in urls:
+            assert snapshot(client, url) == expected[url], \
+                f'Проверьте, что async-версия страницы `{url}` показывает то же, что и обычная'
+        assert snapshot(Client(), '/follow/')['status'] == 302, \
+            'Проверьте, что async-лента требует входа'
+        assert snapshot(client, '/NoSuchUser/')['status'] == 404
+        assert snapshot(client, '/group/no-such-group/')['status'] == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_not_modified(self, pages, settings):
+        paths, reader = pages
+        settings.ROOT_URLCONF = 'yatube.asgi_urls'
+        client = Client()
+        for path in (paths['index'], paths['post']):
+            response = client.get(path)
+            assert response.has_header('ETag'), \
+                f'Проверьте, что async-страница `{path}` отдаёт ETag'
+            response = client.get(path, HTTP_IF_NONE_MATCH=response['ETag'])
+            assert response.status_code == 304
+
+    @pytest.mark.django_db(transaction=True)
+    def test_asgi_application(self, pages):
+        paths, reader = pages
+        cookie = session_cookie(reader)
+        for name, path in paths.items():
+            result = asyncio.run(send_asgi(Request(0, 'GET', path, name, cookie)))
+            assert result.status == 200, \
+                f'Проверьте, что yatube.asgi отвечает на `{path}`'
+        result = asyncio.run(send_asgi(Request(0, 'GET', '/follow/', 'follow_index', None)))
+        assert result.status == 302
+
+    @pytest.mark.django_db(transaction=True)
+    def test_benchmark_asgi(self, pages, tmp_path):
+        output = tmp_path / 'asgi.json'
+        call_command('benchmark_asgi', requests=2, concurrency=[2], warmup=1,
+                     output=str(output), stdout=StringIO())
+        report = json.loads(output.read_text())
+        assert {run['mode'] for run in report['runs']} == {'wsgi', 'asgi'}
+        assert all(run['errors'] == 0 and run['rps'] > 0 for run in report['runs']), \
+            'Проверьте, что benchmark_asgi считает запросы в секунду без ошибок'
@@ -0,0 +1,53 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from posts.models import AuthorStats, Comment, Follow, Post, TimelineEntry
+
+
+class TestBenchmark:
+
+    def generate(self):
+        call_command(
+            'generate_dataset', users=30, posts=300, groups=3, comments=200,
+            follows=5, seed=1, stdout=StringIO(),
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_generate_dataset(self):
+        self.generate()
+        assert Post.objects.count() == 300
+        assert Comment.objects.count() == 200
+        assert Follow.objects.exists()
+
+        counts = sorted(
+            AuthorStats.objects.values_list('posts_count', flat=True), reverse=True
+        )
+        assert sum(counts) == 300, \
+            'Проверьте, что `generate_dataset` пересчитывает счётчики'
+        assert counts[0] > 5 * counts[len(counts) // 2], \
+            'Проверьте, что авторство постов распределено по степенному закону'
+        assert Post.objects.dates('pub_date', 'day').count() > 30, \
+            'Проверьте, что `generate_dataset` сохраняет заданные даты публикации'
+        assert TimelineEntry.objects.exists(), \
+            'Проверьте, что `generate_dataset` заполняет ленты подписок'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_benchmark_urls(self, tmp_path):
+        self.generate()
+        output = tmp_path / 'benchmark.json'
+        call_command(
+            'benchmark_urls', requests=3, warmup=0, memory_requests=1,
+            output=str(output), stdout=StringIO(),
+        )
+        report = json.loads(output.read_text())
+        assert report['dataset']['posts'] == 300
+        assert {'index', 'trending', 'group', 'profile', 'post', 'follow_index'} <= set(report['urls'])
+        assert 'add_comment' in report['skipped']
+        for name, result in report['urls'].items():
+            assert result['status'] == 200, f'`{name}` ответил {result["status"]}'
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+            assert result['queries'] > 0
+            assert result['peak_memory_kb'] > 0
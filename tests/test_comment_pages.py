@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment
+
+
+class TestCommentPages:
+
+    @pytest.fixture
+    def comments(self, post, user, settings):
+        settings.COMMENTS_PER_PAGE = 3
+        return [Comment.objects.create(post=post, author=user, text=f'Комментарий {i}') for i in range(7)]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_view_first_page(self, client, post, comments):
+        response = client.get(f'/{post.author.username}/{post.id}/')
+        page = response.context['comments']
+        assert [comment.pk for comment in page] == [comment.pk for comment in reversed(comments[-3:])], \
+            'Проверьте, что на странице поста выводятся только последние комментарии'
+        assert page.has_next(), \
+            'Проверьте, что у комментариев поста есть курсор на следующую страницу'
+        assert 'comments-more' in response.content.decode(), \
+            'Проверьте, что на странице поста есть ссылка «Показать ещё»'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_fragment(self, client, post, comments):
+        first = client.get(f'/{post.author.username}/{post.id}/').context['comments']
+        url = f'/{post.author.username}/{post.id}/comments/'
+        response = client.get(f'{url}?after={first.next_cursor}')
+        assert response.status_code == 200
+        page = response.context['comments']
+        assert [comment.pk for comment in page] == [comment.pk for comment in reversed(comments[1:4])], \
+            'Проверьте, что фрагмент комментариев продолжает список по курсору'
+
+        response = client.get(f'{url}?after={page.next_cursor}')
+        page = response.context['comments']
+        assert [comment.pk for comment in page] == [comments[0].pk]
+        assert not page.has_next()
+        assert 'comments-more' not in response.content.decode()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_fragment_queries(self, client, post, comments):
+        url = f'/{post.author.username}/{post.id}/comments/'
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        comment_queries = [q['sql'] for q in queries if 'posts_comment' in q['sql']]
+        assert len(comment_queries) == 1, \
+            'Проверьте, что страница комментариев загружается одним запросом'
+        assert all('OFFSET' not in sql for sql in comment_queries), \
+            'Проверьте, что комментарии не листаются через OFFSET'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_fragment_wrong_author(self, client, post, django_user_model):
+        other = django_user_model.objects.create_user(username='Other')
+        response = client.get(f'/{other.username}/{post.id}/comments/')
+        assert response.status_code == 404
@@ -0,0 +1,54 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from posts.models import Comment, Post
+
+
+class TestConditionalGet:
+
+    def assert_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag'), \
+            f'Проверьте, что страница `{url}` отдаёт заголовок ETag'
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == 304, \
+            f'Проверьте, что неизменившаяся страница `{url}` отвечает 304'
+        return response
+
+    @pytest.mark.django_db(transaction=True)
+    def test_pages_not_modified(self, user_client, user, post_with_group):
+        urls = (
+            '/', f'/group/{post_with_group.group.slug}/', '/follow/',
+            f'/{user.username}/', f'/{user.username}/{post_with_group.id}/',
+        )
+        for url in urls:
+            self.assert_not_modified(user_client, url)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_writes_change_etag(self, client, user, post):
+        for url, write in (
+            ('/', lambda: Post.objects.create(text='Новый пост', author=user)),
+            (f'/{user.username}/{post.id}/',
+             lambda: Comment.objects.create(post=post, author=user, text='Коммент')),
+            (f'/{user.username}/', lambda: get_user_model().objects.create_user(
+                username='Follower').follower.create(author=user)),
+        ):
+            etag = client.get(url)['ETag']
+            write()
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, \
+                f'Проверьте, что после изменений страница `{url}` отдаётся заново'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_etag_moves_on_commit(self, client, user, post):
+        url = f'/{user.username}/{post.id}/'
+        etag = client.get(url)['ETag']
+        with transaction.atomic():
+            Comment.objects.create(post=post, author=user, text='Коммент')
+            assert client.get(url)['ETag'] == etag, \
+                'Проверьте, что ETag не меняется до коммита записи'
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, \
+            'Проверьте, что после коммита страница отдаётся заново'
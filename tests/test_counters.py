@@ -0,0 +1,125 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+
+from posts.models import AuthorStats, Comment, Follow, Post
+
+
+class TestCounters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_counters_follow_writes(self, user_client, user, post):
+        author = get_user_model().objects.create_user(username='CounterAuthor')
+        Post.objects.create(text='Пост автора', author=author)
+        user_client.get(f'/{author.username}/follow/')
+
+        response = user_client.get(f'/{author.username}/')
+        assert response.context['posts_count'] == 1
+        assert response.context['followers'] == 1, \
+            'Проверьте, что счётчик подписчиков увеличивается при подписке'
+        assert AuthorStats.objects.get(user=user).following_count == 1
+
+        user_client.get(f'/{author.username}/unfollow/')
+        assert AuthorStats.objects.get(user=author).followers_count == 0, \
+            'Проверьте, что счётчик подписчиков уменьшается при отписке'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_count(self, user_client, user, post):
+        user_client.post(f'/{user.username}/{post.id}/comment/', {'text': 'Коммент'})
+        post.refresh_from_db(fields=['comments_count'])
+        assert post.comments_count == 1, \
+            'Проверьте, что счётчик комментариев увеличивается при комментировании'
+
+        user_client.post(f'/{user.username}/{post.id}/edit/', {'text': 'Новый текст'})
+        post.refresh_from_db(fields=['comments_count'])
+        assert post.comments_count == 1, \
+            'Проверьте, что редактирование поста не сбрасывает счётчик комментариев'
+
+        Comment.objects.filter(post=post).delete()
+        post.refresh_from_db(fields=['comments_count'])
+        assert post.comments_count == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_recount_command(self, user, post):
+        other = get_user_model().objects.create_user(username='CounterOther')
+        Follow.objects.create(user=other, author=user)
+        Comment.objects.create(post=post, author=other, text='Коммент')
+        AuthorStats.objects.all().delete()
+        Post.objects.update(comments_count=0)
+
+        call_command('recount_counters', chunk_size=1)
+        stats = AuthorStats.objects.get(user=user)
+        assert (stats.posts_count, stats.followers_count, stats.following_count) == (1, 1, 0)
+        post.refresh_from_db(fields=['comments_count'])
+        assert post.comments_count == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_drifted_counters_stop_at_zero(self, user, post):
+        other = get_user_model().objects.create_user(username='CounterOther')
+        Follow.objects.create(user=other, author=user)
+        Comment.objects.create(post=post, author=other, text='Коммент')
+        AuthorStats.objects.update(
+            posts_count=0, followers_count=0, following_count=0
+        )
+        Post.objects.update(comments_count=0)
+
+        Comment.objects.filter(post=post).delete()
+        Follow.objects.all().delete()
+        post.delete()
+        stats = AuthorStats.objects.get(user=user)
+        assert (stats.posts_count, stats.followers_count) == (0, 0), \
+            'Проверьте, что разошедшиеся счётчики не уходят ниже нуля'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_missing_stats_created_on_read(self, client, user, post):
+        AuthorStats.objects.all().delete()
+        response = client.get(f'/{user.username}/')
+        assert response.context['posts_count'] == 1
+        stats = AuthorStats.objects.get(user=user)
+        assert stats.posts_count == 1, \
+            'Проверьте, что отсутствующая строка счётчиков создаётся при чтении'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_stats_created_with_user(self):
+        user = get_user_model().objects.create_user(username='CounterNew')
+        stats = AuthorStats.objects.get(user=user)
+        assert (stats.posts_count, stats.followers_count, stats.following_count) == (0, 0, 0), \
+            'Проверьте, что строка счётчиков создаётся вместе с пользователем'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_total_posts(self, client, user, post):
+        from posts import counters
+        assert counters.total_posts() == 1
+        Post.objects.create(text='Ещё пост', author=user)
+        assert counters.total_posts() == 2, \
+            'Проверьте, что число постов растёт при публикации'
+        post.delete()
+        assert counters.total_posts() == 1
+        response = client.get('/')
+        assert response.context['paginator'].count == 1
+
+        Post.objects.bulk_create([Post(text='Импорт', author=user)])
+        call_command('recount_counters')
+        assert counters.total_posts() == 2, \
+            'Проверьте, что recount_counters пересчитывает число постов'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_stale_total_keeps_rows(self, client, user):
+        from posts import counters
+        assert counters.total_posts() == 0
+        Post.objects.bulk_create(
+            [Post(text=f'Пост {i}', author=user) for i in range(12)]
+        )
+        response = client.get('/')
+        page = response.context['page']
+        assert len(page) == 10 and page.has_next(), \
+            'Проверьте, что устаревшее число постов не обрезает первую страницу'
+        response = client.get(f'/?after={page.next_cursor}')
+        assert len(response.context['page']) == 2
+
+        cache.set(counters.TOTAL_POSTS_KEY, 50)
+        page = client.get('/?page=2').context['page']
+        assert (len(page), page.has_next()) == (2, False), \
+            'Проверьте, что устаревшее число постов не ведёт на пустые страницы'
+        assert len(client.get('/?page=9').context['page']) == 10
@@ -0,0 +1,62 @@
+import base64
+
+import pytest
+from django.core.paginator import Page
+
+from posts.pagination import CursorPage
+
+
+class TestCursorPaginator:
+
+    @pytest.fixture
+    def posts(self, user):
+        from posts.models import Post
+        return [Post.objects.create(text=f'Пост {i}', author=user) for i in range(15)]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_cursor_pages(self, client, posts):
+        response = client.get('/')
+        first_page = response.context['page']
+        assert type(first_page) == Page, \
+            'Проверьте, что без `?after=` на странице `/` используется обычная `Page`'
+        assert first_page.next_cursor, \
+            'Проверьте, что у страницы `/` есть курсор на следующую страницу'
+
+        response = client.get(f'/?after={first_page.next_cursor}')
+        page = response.context['page']
+        assert isinstance(page, CursorPage), \
+            'Проверьте, что `?after=` включает постраничный вывод по курсору'
+        assert [post.pk for post in page] == [post.pk for post in reversed(posts[:5])], \
+            'Проверьте, что `?after=` продолжает список с места, где закончилась страница'
+        assert not page.has_next()
+        assert page.has_previous()
+
+        response = client.get(f'/?before={page.previous_cursor}')
+        page = response.context['page']
+        assert [post.pk for post in page] == [post.pk for post in first_page], \
+            'Проверьте, что `?before=` возвращает предыдущую страницу'
+        assert not page.has_previous()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_broken_cursor(self, client, posts):
+        response = client.get('/?after=broken')
+        assert response.status_code == 200
+        assert len(response.context['page']) == 10, \
+            'Проверьте, что неверный курсор приводит к первой странице'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cursor_with_bad_value(self, client, posts):
+        token = base64.urlsafe_b64encode(b'abc|1').decode().rstrip('=')
+        post = posts[0]
+        for url in ('/', '/trending/', f'/{post.author.username}/'):
+            for param in ('after', 'before'):
+                response = client.get(f'{url}?{param}={token}')
+                assert response.status_code == 200, \
+                    f'Проверьте, что курсор с неверным значением не ломает `{url}?{param}=`'
+                assert len(response.context['page']) == len(
+                    client.get(url).context['page']
+                ), 'Проверьте, что неверный курсор приводит к первой странице'
+        response = client.get(f'/{post.author.username}/{post.id}/comments/?after={token}')
+        assert response.status_code == 200
+        response = client.get(f'/api/v1/posts/?after={token}')
+        assert response.status_code == 200
@@ -0,0 +1,78 @@
+import csv
+import datetime
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts import export
+from posts.models import Comment, Follow, Post
+
+
+class TestExport:
+
+    @pytest.fixture
+    def posts(self, user):
+        posts = [Post.objects.create(text=f'Пост {i}', author=user) for i in range(5)]
+        Post.objects.filter(pk__in=[post.pk for post in posts[:2]]).update(
+            pub_date=datetime.datetime(2020, 1, 1)
+        )
+        return posts
+
+    @pytest.mark.django_db(transaction=True)
+    def test_ndjson_command(self, posts):
+        out = StringIO()
+        call_command('export_data', 'posts', chunk_size=2, stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [row['id'] for row in rows] == [post.id for post in posts], \
+            'Проверьте, что `export_data` выгружает все строки по порядку id'
+        assert rows[0]['text'] == 'Пост 0'
+        assert rows[0]['pub_date'].startswith('2020-01-01')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_since(self, posts):
+        out = StringIO()
+        call_command('export_data', 'posts', since='2021-01-01', stdout=out)
+        assert len(out.getvalue().splitlines()) == 3, \
+            'Проверьте, что `--since` оставляет только новые посты'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_csv_comments(self, post, user):
+        Comment.objects.create(post=post, author=user, text='Комментарий, с запятой')
+        out = StringIO()
+        call_command('export_data', 'comments', format='csv', stdout=out)
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        assert rows[0] == ['id', 'post_id', 'author_id', 'text', 'created']
+        assert rows[1][3] == 'Комментарий, с запятой'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_keyset_chunks(self, posts):
+        with CaptureQueriesContext(connection) as context:
+            rows = list(export.rows('posts', chunk_size=2))
+        assert len(rows) == 5
+        assert len(context.captured_queries) == 3, \
+            'Проверьте, что выгрузка читает таблицу порциями по `chunk_size`'
+        assert all('OFFSET' not in query['sql'] for query in context.captured_queries)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_view(self, client, user, django_user_model, posts):
+        Follow.objects.create(user=django_user_model.objects.create_user(username='Reader'), author=user)
+        response = client.get('/export/follows/')
+        assert response.status_code == 302, 'Проверьте, что выгрузка доступна только персоналу'
+
+        staff = django_user_model.objects.create_user(username='Staff', is_staff=True)
+        client.force_login(staff)
+        response = client.get('/export/posts/?format=csv&since=2021-01-01')
+        assert response.status_code == 200
+        assert response.streaming, 'Проверьте, что выгрузка отдаётся `StreamingHttpResponse`'
+        assert response['Content-Type'] == 'text/csv'
+        assert len(b''.join(response.streaming_content).decode().splitlines()) == 4
+
+        response = client.get('/export/follows/')
+        assert json.loads(b''.join(response.streaming_content))['user_id'] != user.id
+        assert client.get('/export/posts/?format=xml').status_code == 400
+        assert client.get('/export/users/').status_code == 404
@@ -0,0 +1,127 @@
+from importlib import import_module
+from io import BytesIO, StringIO
+
+import pytest
+from django.apps import apps
+from django.core.files.base import File
+from django.core.management import call_command
+from PIL import Image
+
+from posts.models import Post
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+class TestImageStorage:
+
+    @staticmethod
+    def get_image_file(name, size=(3000, 1000), image_format='jpeg'):
+        file_obj = BytesIO()
+        image = Image.new('RGB', size=size, color=(255, 0, 0))
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        if image_format == 'mpo':
+            image.save(file_obj, image_format, exif=exif, save_all=True,
+                       append_images=[image])
+        else:
+            image.save(file_obj, image_format, exif=exif)
+        file_obj.seek(0)
+        return File(file_obj, name=name)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_upload_normalized_and_deduplicated(self, settings, media, user_client, user):
+        settings.IMAGE_MAX_SIZE = 1500
+        for name in ('first.jpg', 'second.jpg'):
+            response = user_client.post('/new/', {
+                'text': f'Пост {name}', 'image': self.get_image_file(name),
+            })
+            assert response.status_code == 302
+
+        first, second = Post.objects.order_by('id')
+        assert first.image.name == second.image.name, \
+            'Проверьте, что одинаковые изображения хранятся в одном файле'
+        assert first.image.name.startswith('posts/') and len(first.image.name.split('/')) == 4, \
+            'Проверьте, что изображения хранятся по пути из хеша содержимого'
+        assert (first.image_width, first.image_height) == (1500, 500), \
+            'Проверьте, что слишком большие изображения уменьшаются при загрузке'
+        assert first.image_size == first.image.size
+
+        with Image.open(first.image.path) as image:
+            assert not image.getexif(), 'Проверьте, что из изображений удаляются EXIF'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_mpo_normalized_as_jpeg(self, settings, media, user_client, user):
+        settings.IMAGE_MAX_SIZE = 1500
+        response = user_client.post('/new/', {
+            'text': 'Пост с телефона',
+            'image': self.get_image_file('phone.jpg', image_format='mpo'),
+        })
+        assert response.status_code == 302
+
+        post = Post.objects.get()
+        assert (post.image_width, post.image_height) == (1500, 500), \
+            'Проверьте, что снимки MPO уменьшаются как JPEG'
+        with Image.open(post.image.path) as image:
+            assert image.format == 'JPEG'
+            assert not image.getexif(), 'Проверьте, что из снимков MPO удаляются EXIF'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_shared_file_kept(self, media, user_client, user):
+        for name in ('first.jpg', 'second.jpg'):
+            user_client.post('/new/', {
+                'text': f'Пост {name}', 'image': self.get_image_file(name),
+            })
+        first, second = Post.objects.order_by('id')
+        path = media / first.image.name
+
+        first.image.delete()
+        assert path.exists(), \
+            'Проверьте, что удаление изображения поста не удаляет общий файл'
+        call_command('collect_images', min_age=0, stdout=StringIO())
+        assert path.exists(), \
+            'Проверьте, что collect_images не удаляет файлы, на которые ссылаются посты'
+
+        second.delete()
+        call_command('collect_images', stdout=StringIO())
+        assert path.exists(), 'Проверьте, что свежие файлы не удаляются'
+        call_command('collect_images', min_age=0, stdout=StringIO())
+        assert not path.exists(), \
+            'Проверьте, что collect_images удаляет файлы без ссылок'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_dimensions_kept_by_field(self, media, user_client, user):
+        user_client.post('/new/', {
+            'text': 'Пост', 'image': self.get_image_file('first.jpg', size=(300, 100)),
+        })
+        post = Post.objects.get()
+        assert (post.image_width, post.image_height) == (300, 100)
+
+        url = f'/{user.username}/{post.id}/edit/'
+        user_client.post(url, {'text': 'Новый текст'})
+        post = Post.objects.get()
+        assert (post.image_width, post.image_height) == (300, 100), \
+            'Проверьте, что редактирование без нового изображения сохраняет его размеры'
+
+        user_client.post(url, {'text': 'Без картинки', 'image-clear': 'on'})
+        post = Post.objects.get()
+        assert not post.image and post.image_width is None and post.image_height is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_dimensions_backfilled(self, media, user_client, user):
+        user_client.post('/new/', {
+            'text': 'Пост', 'image': self.get_image_file('first.jpg', size=(300, 100)),
+        })
+        Post.objects.create(text='Потерянный файл', author=user, image='posts/missing.jpg')
+        Post.objects.update(image_width=None, image_height=None, image_size=None)
+
+        migration = import_module('posts.migrations.0020_image_dimensions')
+        migration.fill_dimensions(apps, None)
+        post, lost = Post.objects.order_by('id')
+        assert (post.image_width, post.image_height) == (300, 100), \
+            'Проверьте, что миграция заполняет размеры старых изображений'
+        assert post.image_size == post.image.size
+        assert lost.image_width is None
@@ -0,0 +1,106 @@
+import datetime
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from posts.models import AuthorStats, Comment, Follow, Group, Post, TimelineEntry
+from posts.search import SearchResults
+
+
+class TestImport:
+
+    @pytest.fixture
+    def files(self, tmp_path, user):
+        posts = tmp_path / 'posts.ndjson'
+        posts.write_text('\n'.join(json.dumps(row, ensure_ascii=False) for row in (
+            {'id': 101, 'text': 'Старый пост', 'pub_date': '2015-03-01T10:00:00',
+             'author': 'migrated', 'group': 'imported'},
+            {'id': 102, 'text': 'Пост без группы', 'pub_date': '2016-05-02', 'author': user.username},
+            {'id': 103, 'text': 'Пост неизвестного', 'author': 'ghost', 'group': 'imported'},
+        )) + '\n')
+        comments = tmp_path / 'comments.csv'
+        comments.write_text(
+            'post,author,text,created\n'
+            f'101,{user.username},"Комментарий, старый",2015-03-02T12:00:00\n'
+            '999,migrated,К чужому посту,2015-03-02\n'
+        )
+        follows = tmp_path / 'follows.csv'
+        follows.write_text(f'user,author\n{user.username},migrated\nmigrated,migrated\n')
+        return posts, comments, follows
+
+    @pytest.mark.django_db(transaction=True)
+    def test_import(self, files, user):
+        posts, comments, follows = files
+        out = StringIO()
+        call_command(
+            'import_data', posts=str(posts), comments=str(comments), follows=str(follows),
+            create_users=True, create_groups=True, batch_size=2, stdout=out,
+        )
+        assert Post.objects.count() == 3
+        old = Post.objects.get(text='Старый пост')
+        assert old.pub_date == datetime.datetime(2015, 3, 1, 10), \
+            'Проверьте, что импорт сохраняет `pub_date` из исходных данных'
+        assert old.author.username == 'migrated'
+        assert old.group == Group.objects.get(slug='imported')
+        assert Post.objects.get(text='Пост без группы').pub_date == datetime.datetime(2016, 5, 2)
+
+        comment = Comment.objects.get()
+        assert comment.post == old, 'Проверьте, что комментарии ссылаются на импортированные посты'
+        assert comment.created == datetime.datetime(2015, 3, 2, 12)
+
+        assert Follow.objects.get().user == user
+        assert AuthorStats.objects.get(user=old.author).followers_count == 1
+        assert TimelineEntry.objects.filter(user=user, post=old).exists()
+        assert old.comments_count == 1, 'Проверьте, что после импорта пересчитываются счётчики'
+
+        output = out.getvalue()
+        assert 'posts: 3 rows' in output
+        assert 'comments: 1 rows' in output and '1 skipped' in output
+        assert 'rows/s' in output
+
+    @pytest.mark.django_db(transaction=True)
+    def test_unknown_names_skipped(self, files):
+        posts = files[0]
+        out = StringIO()
+        call_command('import_data', posts=str(posts), stdout=out)
+        assert Post.objects.count() == 1, \
+            'Проверьте, что строки с неизвестными авторами и группами пропускаются'
+        assert 'posts: 1 rows' in out.getvalue()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_defer_indexes(self, files):
+        posts = files[0]
+        call_command('import_data', posts=str(posts), create_users=True,
+                     create_groups=True, defer_indexes=True, stdout=StringIO())
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, 'posts_post')
+        assert 'post_author_pub_date_idx' in constraints, \
+            'Проверьте, что отложенные индексы создаются после импорта'
+        assert Post.objects.count() == 3
+
+    @pytest.mark.django_db(transaction=True)
+    def test_refresh_limited_to_imported_rows(self, files, user, django_user_model):
+        bystander = django_user_model.objects.create_user(username='bystander')
+        Post.objects.create(text='Пост стороннего', author=bystander)
+        AuthorStats.objects.filter(user=bystander).update(posts_count=7)
+        posts, comments, follows = files
+        call_command(
+            'import_data', posts=str(posts), comments=str(comments), follows=str(follows),
+            create_users=True, create_groups=True, stdout=StringIO(),
+        )
+        assert AuthorStats.objects.get(user=bystander).posts_count == 7, \
+            'Проверьте, что после импорта пересчитываются только затронутые авторы'
+        old = Post.objects.get(text='Старый пост')
+        assert AuthorStats.objects.get(user=old.author).posts_count == 1
+        assert old.comments_count == 1
+        assert TimelineEntry.objects.filter(user=user, post=old).exists()
+        assert list(SearchResults('Старый')) == [old], \
+            'Проверьте, что импортированные посты попадают в поиск'
+
+        call_command('import_data', follows=str(follows), full_refresh=True,
+                     stdout=StringIO())
+        assert AuthorStats.objects.get(user=bystander).posts_count == 1, \
+            'Проверьте, что --full-refresh пересчитывает весь сайт'
@@ -0,0 +1,30 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment, Post
+
+
+class TestListQueries:
+
+    def count_queries(self, client, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(context.captured_queries)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_list_queries_do_not_grow(self, client, user, group):
+        post = Post.objects.create(text='Пост', author=user, group=group)
+        Comment.objects.create(post=post, author=user, text='Коммент')
+        urls = ('/', f'/group/{group.slug}/', f'/{user.username}/')
+        single = {url: self.count_queries(client, url) for url in urls}
+
+        for i in range(9):
+            post = Post.objects.create(text=f'Пост {i}', author=user, group=group)
+            Comment.objects.create(post=post, author=user, text='Коммент')
+        for url in urls:
+            assert self.count_queries(client, url) == single[url], \
+                f'Проверьте, что число запросов на странице `{url}` не зависит от числа постов'
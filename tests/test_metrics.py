@@ -0,0 +1,83 @@
+import multiprocessing
+import re
+
+import pytest
+
+from posts import metrics
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path / 'metrics')
+    return settings.METRICS_DIR
+
+
+@pytest.fixture
+def metrics_token(settings):
+    settings.METRICS_TOKEN = 'scraper-token'
+    return {'HTTP_AUTHORIZATION': 'Bearer scraper-token'}
+
+
+def sample(text, name, **labels):
+    label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf'^{re.escape(name)}\{{{re.escape(label_text)}\}} (\S+)$', text, re.M)
+    return float(match.group(1)) if match else None
+
+
+def _child(amount):
+    metrics.inc('yatube_cache_requests_total', amount, fragment='post_card', result='hit')
+
+
+class TestMetrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_endpoint(self, client, post, metrics_dir, metrics_token):
+        client.get('/')
+        client.get('/')
+        client.get(f'/{post.author.username}/{post.id}/')
+        response = client.get('/metrics', **metrics_token)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        text = response.content.decode()
+        assert sample(text, 'yatube_request_duration_seconds_count', view='index') == 2, \
+            'Проверьте, что /metrics считает запросы по имени URL'
+        assert sample(text, 'yatube_request_duration_seconds_bucket', view='index', le='+Inf') == 2
+        assert sample(text, 'yatube_db_queries_total', view='post') > 0, \
+            'Проверьте, что /metrics считает SQL-запросы по представлениям'
+        assert sample(text, 'yatube_template_render_seconds_count', template='index.html') == 2
+        assert sample(text, 'yatube_template_render_seconds_count', template='post.html') == 1
+        assert sample(text, 'yatube_cache_requests_total', fragment='post_card', result='miss') == 1
+        assert sample(text, 'yatube_cache_requests_total', fragment='post_card', result='hit') == 1, \
+            'Проверьте, что /metrics считает попадания в кеш карточек'
+        assert '# TYPE yatube_request_duration_seconds histogram' in text
+
+    @pytest.mark.django_db(transaction=True)
+    def test_token_required(self, client, settings, metrics_dir, metrics_token):
+        assert client.get('/metrics').status_code == 404, \
+            'Проверьте, что /metrics требует токен, в том числе с 127.0.0.1'
+        assert client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code == 404
+        settings.METRICS_TOKEN = None
+        assert client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code == 404, \
+            'Проверьте, что без METRICS_TOKEN /metrics выключен'
+
+    def test_processes_add_up(self, metrics_dir):
+        metrics.inc('yatube_cache_requests_total', 2, fragment='post_card', result='hit')
+        processes = [multiprocessing.Process(target=_child, args=(amount,))
+                     for amount in (3, 5)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        text = metrics.render()
+        assert sample(text, 'yatube_cache_requests_total', fragment='post_card', result='hit') == 10, \
+            'Проверьте, что метрики суммируются по всем процессам'
+
+    def test_file_grows(self, metrics_dir):
+        for number in range(3000):
+            metrics.observe('yatube_template_render_seconds', 0.003, template=f'page{number}.html')
+        metrics.observe('yatube_template_render_seconds', 0.2, template='page1.html')
+        text = metrics.render()
+        assert sample(text, 'yatube_template_render_seconds_count', template='page2999.html') == 1
+        assert sample(text, 'yatube_template_render_seconds_bucket', template='page1.html', le='0.005') == 1
+        assert sample(text, 'yatube_template_render_seconds_bucket', template='page1.html', le='0.25') == 2
+        assert sample(text, 'yatube_template_render_seconds_sum', template='page1.html') == pytest.approx(0.203)
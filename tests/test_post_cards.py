@@ -0,0 +1,63 @@
+import pytest
+from django.db import transaction
+
+from posts import generations
+from posts.models import Comment, Post
+
+
+class TestPostCards:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cards_follow_writes(self, client, user, post_with_group):
+        response = client.get('/')
+        assert 'Тестовый пост 2' in response.content.decode()
+
+        post_with_group.text = 'Изменённый пост'
+        post_with_group.save()
+        response = client.get('/')
+        assert 'Изменённый пост' in response.content.decode(), \
+            'Проверьте, что изменённый пост сразу виден на главной странице'
+
+        Comment.objects.create(post=post_with_group, author=user, text='Коммент')
+        response = client.get(f'/group/{post_with_group.group.slug}/')
+        assert '1 комментариев' in response.content.decode(), \
+            'Проверьте, что новый комментарий сразу виден в карточке поста'
+
+        post_with_group.group.title = 'Новое название'
+        post_with_group.group.save()
+        response = client.get(f'/{user.username}/')
+        assert '#Новое название' in response.content.decode(), \
+            'Проверьте, что изменение группы сразу видно в карточке поста'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_pages_differ(self, client, user):
+        for i in range(11):
+            Post.objects.create(text=f'Пост номер {i}', author=user)
+        client.get('/')
+        response = client.get('/?page=2')
+        content = response.content.decode()
+        assert 'Пост номер 0' in content and 'Пост номер 10' not in content, \
+            'Проверьте, что вторая страница главной не показывает посты первой'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_stamps_move_on_commit(self, user, post_with_group):
+        name = generations.key('post', post_with_group.pk)
+        before = generations.get_many([name])[name]
+        with transaction.atomic():
+            post_with_group.text = 'Изменённый пост'
+            post_with_group.save()
+            Comment.objects.create(post=post_with_group, author=user, text='Коммент')
+            assert generations.get_many([name])[name] == before, \
+                'Проверьте, что штампы карточек меняются только после коммита'
+        assert generations.get_many([name])[name] != before
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comment_edit_moves_stamps(self, user, post_with_group):
+        comment = Comment.objects.create(post=post_with_group, author=user, text='Коммент')
+        names = [generations.key('post', post_with_group.pk), generations.key('index', 0)]
+        before = generations.get_many(names)
+        comment.text = 'Исправленный коммент'
+        comment.save()
+        after = generations.get_many(names)
+        assert all(after[name] != before[name] for name in names), \
+            'Проверьте, что правка комментария сбрасывает кеш поста и ленты'
@@ -0,0 +1,57 @@
+import pstats
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from posts.profiling import dumps, make_token
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_DIR = str(tmp_path / 'profiles')
+    return settings
+
+
+class TestProfiling:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_sampling(self, client, post, profile_dir):
+        client.get('/')
+        client.get('/', HTTP_X_PROFILE='not-a-token')
+        assert dumps() == [], \
+            'Проверьте, что без выборки и подписанного заголовка запросы не профилируются'
+
+        client.get('/', HTTP_X_PROFILE=make_token())
+        assert [name for name, moment, path in dumps()] == ['index'], \
+            'Проверьте, что запрос с подписанным заголовком X-Profile профилируется'
+
+        profile_dir.PROFILE_SAMPLE_RATE = 1
+        client.get(f'/{post.author.username}/{post.id}/')
+        client.get(f'/{post.author.username}/')
+        found = dumps()
+        assert [name for name, moment, path in found] == ['index', 'post', 'profile']
+        assert pstats.Stats(found[1][2]).total_calls > 0
+        assert [name for name, moment, path in dumps(names=['post'])] == ['post']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_profile_report(self, client, post, profile_dir, tmp_path):
+        profile_dir.PROFILE_SAMPLE_RATE = 1
+        for _ in range(3):
+            client.get('/')
+        client.get(f'/{post.author.username}/')
+        output = tmp_path / 'merged.prof'
+        stdout = StringIO()
+        call_command('profile_report', sort='tottime', limit=10,
+                     output=str(output), stdout=stdout)
+        report = stdout.getvalue()
+        assert 'Dumps: 4,' in report and 'index 3' in report and 'profile 1' in report, \
+            'Проверьте, что profile_report считает профили по именам URL'
+        assert 'tottime' in report
+        merged = pstats.Stats(str(output))
+        assert any(name == 'render' for (file, line, name) in merged.stats), \
+            'Проверьте, что объединённый дамп содержит функции всех запросов'
+
+        stdout = StringIO()
+        call_command('profile_report', urls=['profile'], stdout=stdout)
+        assert stdout.getvalue().startswith('Dumps: 1,')
@@ -0,0 +1,53 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from posts.budgets import QUERY_BUDGETS
+from posts.models import Comment, Follow, Post
+from posts.querycount import (QueryBudgetExceeded, QueryRecorder,
+                              normalize_sql)
+
+
+class TestQueryBudget:
+
+    @pytest.fixture
+    def author(self, user, group):
+        author = get_user_model().objects.create_user(username='BudgetAuthor')
+        for i in range(12):
+            post = Post.objects.create(text=f'Пост {i}', author=author, group=group)
+            for j in range(3):
+                Comment.objects.create(post=post, author=user, text='Коммент')
+        Follow.objects.create(user=user, author=author)
+        return author
+
+    @pytest.mark.django_db(transaction=True)
+    def test_views_within_budget(self, user_client, group, author):
+        post = author.posts.first()
+        urls = (
+            '/', f'/group/{group.slug}/', '/follow/', f'/{author.username}/',
+            f'/{author.username}/{post.id}/', '/new/',
+        )
+        for url in urls:
+            response = user_client.get(url)
+            assert response.status_code == 200
+        user_client.post(f'/{author.username}/{post.id}/comment/', {'text': 'Коммент'})
+        user_client.get(f'/{author.username}/unfollow/')
+        user_client.get(f'/{author.username}/follow/')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_budget_exceeded(self, monkeypatch, client, author):
+        monkeypatch.setitem(QUERY_BUDGETS, 'index', 0)
+        with pytest.raises(QueryBudgetExceeded):
+            client.get('/')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_n_plus_one_detected(self, settings, author):
+        settings.QUERY_REPEAT_LIMIT = 3
+        with QueryRecorder() as recorder:
+            for post in Post.objects.all():
+                post.author.username
+        assert len(recorder.repeated()) == 1, \
+            'Проверьте, что повторяющиеся запросы распознаются как N+1'
+
+    def test_normalize_sql(self):
+        assert normalize_sql("SELECT 1 FROM t WHERE a = 'x' AND b IN (%s, %s)") == \
+            'SELECT ? FROM t WHERE a = ? AND b IN (...)'
@@ -0,0 +1,103 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment, Follow, Post
+
+LARGE_TABLES = ('posts_post', 'posts_comment', 'posts_follow', 'posts_timelineentry')
+FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)\b')
+# Plans that sort on purpose: the rows of a feed come from the user's
+# timeline, which is never longer than TIMELINE_LENGTH.
+ALLOWED_SORTS = {
+    '/follow/': 'posts_timelineentry',
+}
+# Plans that walk a whole index on purpose: the newest posts of the site
+# have nothing to search on, the walk follows the order of the index and
+# stops at the LIMIT of the page.
+ALLOWED_SCANS = {
+    '/': 'posts_post',
+    '/api/v1/posts/': 'posts_post',
+}
+
+
+def query_plans(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    plans = []
+    for query in context.captured_queries:
+        sql = query['sql']
+        if not sql.startswith('SELECT') or not any(f'"{table}"' in sql for table in LARGE_TABLES):
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql.replace('%', '%%'))
+            plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+    return plans
+
+
+class TestQueryPlans:
+
+    @pytest.fixture
+    def data(self, user, group, django_user_model):
+        reader = django_user_model.objects.create_user(username='Reader')
+        posts = []
+        for i in range(12):
+            post = Post.objects.create(text=f'Пост {i}', author=user, group=group)
+            Comment.objects.create(post=post, author=reader, text=f'Комментарий {i}')
+            posts.append(post)
+        for i in range(25):
+            Comment.objects.create(post=posts[-1], author=reader, text='Ещё комментарий')
+        Follow.objects.create(user=reader, author=user)
+        return reader, posts[-1]
+
+    def urls(self, client, user, group, post):
+        urls = [
+            '/',
+            f'/group/{group.slug}/',
+            f'/{user.username}/',
+            '/follow/',
+            '/trending/',
+        ]
+        for url in list(urls):
+            page = client.get(url).context['page']
+            if page.next_cursor:
+                urls.append(f'{url}?after={page.next_cursor}')
+        urls.append(f'/{user.username}/{post.id}/')
+        comments = client.get(f'/{user.username}/{post.id}/').context['comments']
+        urls.append(f'/{user.username}/{post.id}/comments/?after={comments.next_cursor}')
+        for url in (
+            '/api/v1/posts/?limit=5', f'/api/v1/posts/?limit=5&author={user.username}',
+            f'/api/v1/posts/?limit=5&group={group.slug}', f'/api/v1/posts/{post.id}/comments/?limit=5',
+            f'/api/v1/follows/?author={user.username}', f'/api/v1/follows/?user={user.username}',
+        ):
+            urls.append(url)
+            urls.append(f'{url}&after={client.get(url).json()["next"]}')
+        return urls
+
+    @pytest.mark.django_db(transaction=True)
+    def test_view_query_plans(self, client, user, group, data):
+        reader, post = data
+        client.force_login(reader)
+        for url in self.urls(client, user, group, post):
+            for sql, plan in query_plans(client, url):
+                details = '\n'.join(plan)
+                for table in FULL_SCAN.findall(details):
+                    if ALLOWED_SCANS.get(url.split('?')[0]) == table and ' LIMIT ' in sql \
+                            and 'TEMP B-TREE' not in details:
+                        continue
+                    assert table not in LARGE_TABLES, \
+                        f'Страница `{url}` читает всю таблицу `{table}`:\n{sql}\n{details}'
+                if 'TEMP B-TREE' in details:
+                    allowed = ALLOWED_SORTS.get(url.split('?')[0])
+                    assert allowed and f'"{allowed}"' in sql, \
+                        f'Страница `{url}` сортирует строки без индекса:\n{sql}\n{details}'
+
+    def test_plan_detection(self):
+        assert FULL_SCAN.findall('SCAN posts_post') == ['posts_post']
+        assert FULL_SCAN.findall('SCAN TABLE posts_comment') == ['posts_comment']
+        assert FULL_SCAN.findall('SCAN posts_post USING INDEX posts_post_pub_date') == ['posts_post'], \
+            'Проверьте, что обход всего индекса считается полным просмотром'
+        assert FULL_SCAN.findall('SCAN posts_follow USING COVERING INDEX follow_idx') == ['posts_follow']
+        assert not FULL_SCAN.findall('SEARCH posts_post USING INDEX post_author_pub_date_idx (author_id=?)')
@@ -0,0 +1,125 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from posts import recommendations
+from posts.models import Follow, Post, Recommendation
+
+
+@pytest.fixture
+def graph(user):
+    """TestUser follows a and b, who follow c, d and e; d has a post."""
+    User = get_user_model()
+    a, b, c, d, e = (User.objects.create_user(username=name)
+                     for name in ('a', 'b', 'c', 'd', 'e'))
+    for follower, author in ((user, a), (user, b), (a, c), (b, c), (b, d),
+                             (c, e), (d, e), (a, e)):
+        Follow.objects.create(user=follower, author=author)
+    Post.objects.create(text='Пост', author=d)
+    return a, b, c, d, e
+
+
+class TestRecommendations:
+
+    def test_recommend(self):
+        # 0 follows 1 and 2; 1 and 2 follow 3, 2 follows 4; 4 posts more.
+        graph = recommendations.Graph(
+            ids=[10, 11, 12, 13, 14],
+            indptr=[0, 2, 3, 5, 5, 5],
+            indices=[1, 2, 3, 3, 4],
+            activity=[0, 0, 0, 0, 7],
+            popular=[3, 1, 2, 4, 0],
+        )
+        assert recommendations.recommend(graph, 0, top=2) == [(3, 2), (4, 1)], \
+            'Проверьте, что кандидаты упорядочены по числу общих подписок'
+        assert recommendations.recommend(graph, 1, top=2) == [(2, 0), (4, 0)], \
+            'Проверьте, что короткий список дополняется популярными авторами'
+        assert recommendations.score(graph, 2, 3, top=1) == [(12, [(11, 0)])]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_load_graph(self, user, graph):
+        users = dict(get_user_model().objects.order_by('pk')
+                     .values_list('pk', 'username'))
+        loaded = recommendations.load_graph(users)
+        ids = list(loaded.ids)
+        assert sorted(ids[author] for author in loaded.followed(0)) == \
+            [graph[0].pk, graph[1].pk], \
+            'Проверьте, что граф подписок загружается в массивы CSR'
+        assert loaded.indptr[-1] == Follow.objects.count()
+        assert loaded.activity[ids.index(graph[3].pk)] == 1
+        assert ids[loaded.popular[0]] in (graph[2].pk, graph[4].pk)
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('processes', [1, 2])
+    def test_rebuild(self, user, graph, processes):
+        a, b, c, d, e = graph
+        stdout = StringIO()
+        call_command('recommend_authors', top=2, processes=processes,
+                     chunk_size=2, stdout=stdout)
+        assert stdout.getvalue().startswith('Recommended authors to 6 users'), \
+            'Проверьте, что recommend_authors обходит всех пользователей'
+        row = Recommendation.objects.get(user=user)
+        assert row.authors == [
+            {'id': c.pk, 'username': 'c', 'mutual': 2},
+            {'id': d.pk, 'username': 'd', 'mutual': 1},
+        ], 'Проверьте, что рекомендации сохраняются одной строкой на пользователя'
+        assert Recommendation.objects.count() == 6
+
+    @pytest.mark.django_db(transaction=True)
+    def test_views(self, user, user_client, graph):
+        a, b, c, d, e = graph
+        recommendations.rebuild(top=2)
+        response = user_client.get('/follow/')
+        assert [author['username'] for author in
+                response.context['recommendations']] == ['c', 'd'], \
+            'Проверьте, что рекомендации выводятся на странице подписок, ' \
+            'при равенстве общих подписок выше активный автор'
+        assert 'Общих подписок: 2' in response.content.decode()
+        response = user_client.get(f'/{c.username}/')
+        assert [author['username'] for author in
+                response.context['recommendations']] == ['d'], \
+            'Проверьте, что автор страницы не рекомендуется сам себе'
+
+        etag = user_client.get('/follow/')['ETag']
+        user_client.get(f'/{c.username}/follow/')
+        assert [author['username'] for author in
+                recommendations.for_user(user)] == ['d'], \
+            'Проверьте, что после подписки автор убирается из рекомендаций'
+        response = user_client.get('/follow/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert [author['username'] for author in
+                response.context['recommendations']] == ['d']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_anonymous(self, client, graph):
+        recommendations.rebuild()
+        response = client.get(f'/{graph[0].username}/')
+        assert response.context['recommendations'] == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_late_users_skipped(self, user, graph):
+        users = dict(get_user_model().objects.order_by('pk')
+                     .values_list('pk', 'username'))
+        late = get_user_model().objects.create_user(username='late')
+        Follow.objects.create(user=late, author=graph[0])
+        Follow.objects.create(user=user, author=late)
+        Post.objects.create(text='Пост новичка', author=late)
+        loaded = recommendations.load_graph(users)
+        assert len(loaded) == len(users), \
+            'Проверьте, что пользователи, появившиеся во время загрузки, пропускаются'
+        assert loaded.indptr[-1] == Follow.objects.count() - 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_scores_computed_before_the_transaction(self, user, graph, monkeypatch):
+        stored = []
+
+        def store(chunks, usernames):
+            stored.append(chunks)
+            return 0
+
+        monkeypatch.setattr(recommendations, 'store', store)
+        recommendations.rebuild()
+        assert isinstance(stored[0], list), \
+            'Проверьте, что рекомендации считаются до транзакции, заменяющей строки'
@@ -0,0 +1,58 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from posts.replay import PathMapper, parse_log
+
+LOG = '''\
+10.0.0.1 - - [17/Oct/2026:10:00:00 +0000] "GET / HTTP/1.1" 200 512 "-" "curl"
+10.0.0.1 - alice [17/Oct/2026:10:00:01 +0000] "GET /follow/ HTTP/1.1" 200 512
+10.0.0.2 - - [17/Oct/2026:10:00:02 +0000] "GET /remote_author/ HTTP/1.1" 200 512
+10.0.0.2 - - [17/Oct/2026:10:00:03 +0000] "GET /remote_author/77/ HTTP/1.1" 200 512
+10.0.0.2 - bob [17/Oct/2026:10:00:04 +0000] "POST /remote_author/follow/ HTTP/1.1" 302 0
+not a log line
+{"time": "2026-10-17T10:00:05+00:00", "method": "GET", "path": "/search/?q=кот"}
+{"time": "2026-10-17T10:00:06+00:00", "path": "/no/such/page/at/all/"}
+'''
+
+
+class TestReplay:
+
+    def test_parse_log(self):
+        entries = parse_log(LOG.splitlines())
+        assert len(entries) == 7, 'Проверьте, что строки не из лога пропускаются'
+        assert [entry.offset for entry in entries] == [0, 1, 2, 3, 4, 5, 6]
+        assert entries[1].user == 'alice'
+        assert entries[0].user is None
+        assert entries[4].method == 'POST'
+        assert entries[5].path == '/search/?q=кот'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_path_mapper(self, post, group):
+        mapper = PathMapper()
+        assert mapper.map('/remote_author/77/') == (
+            'post', f'/{post.author.username}/{post.id}/'
+        ), 'Проверьте, что пути переносятся на локальных авторов и их посты'
+        assert mapper.map('/group/remote-slug/') == ('group', f'/group/{group.slug}/')
+        assert mapper.map('/search/?q=кот') == ('search', '/search/?q=%D0%BA%D0%BE%D1%82')
+        assert mapper.map('/no/such/page/at/all/') is None
+        assert mapper.cookie('alice') == mapper.cookie('alice')
+        assert mapper.cookie(None) is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_replay_log(self, post, tmp_path):
+        log = tmp_path / 'access.log'
+        log.write_text(LOG)
+        output = tmp_path / 'replay.json'
+        call_command('replay_log', str(log), workers=2, output=str(output),
+                     stdout=StringIO())
+        report = json.loads(output.read_text())
+        assert report['requests'] == 5
+        assert report['skipped'] == {'method': 1, 'unmapped': 1}
+        assert report['error_rate'] == 0
+        assert set(report['urls']) == {'index', 'follow_index', 'profile', 'post', 'search'}
+        assert report['urls']['follow_index']['statuses'] == {'200': 1}, \
+            'Проверьте, что запросы с пользователем из лога идут с его сессией'
+        assert sum(report['urls']['post']['histogram'].values()) == 1
@@ -0,0 +1,58 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from posts.routers import PIN_COOKIE, REPLICA
+
+
+@pytest.fixture
+def replica(tmp_path):
+    """Point the ``replica`` alias at a file of its own for the test."""
+    connection = connections[REPLICA]
+    mirror = connection.settings_dict
+    connection.close()
+    connection.settings_dict = {**mirror,
+                                'NAME': str(tmp_path / 'replica.sqlite3')}
+    yield connection
+    connection.close()
+    connection.settings_dict = mirror
+
+
+class TestReplica:
+
+    @pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+    def test_reads_and_pin(self, replica, user_client, post):
+        call_command('sync_replica', stdout=StringIO())
+        guest = Client(REMOTE_ADDR='192.0.2.1')
+        with CaptureQueriesContext(replica) as queries:
+            response = guest.get('/')
+        assert post.text in response.content.decode()
+        assert queries.captured_queries, \
+            'Проверьте, что главная страница читает посты из реплики'
+
+        response = user_client.post('/new/', {'text': 'Пост с реплики'})
+        assert response.status_code == 302
+        assert response.cookies[PIN_COOKIE]['max-age'], \
+            'Проверьте, что после записи ставится cookie привязки к основной базе'
+        with CaptureQueriesContext(replica) as queries:
+            response = user_client.get('/')
+        assert 'Пост с реплики' in response.content.decode(), \
+            'Проверьте, что автор сразу видит свой пост'
+        assert not queries.captured_queries
+
+        assert 'Пост с реплики' not in guest.get('/').content.decode(), \
+            'Проверьте, что гости читают реплику до синхронизации'
+        call_command('sync_replica', stdout=StringIO())
+        assert 'Пост с реплики' in guest.get('/').content.decode(), \
+            'Проверьте, что после синхронизации страницы строятся заново'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_mirror_reads_primary(self, client, post):
+        with CaptureQueriesContext(connections['default']) as queries:
+            client.get('/')
+        assert queries.captured_queries, \
+            'Проверьте, что без отдельной реплики чтение идёт в основную базу'
@@ -0,0 +1,62 @@
+import pytest
+from django.core.management import call_command
+
+from posts.models import Comment, Post
+
+
+class TestSearch:
+
+    def found(self, client, query):
+        response = client.get('/search/', {'q': query})
+        assert response.status_code == 200
+        return [post.pk for post in response.context['page']]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_search_view(self, client, user):
+        apple = Post.objects.create(text='Яблоки растут на деревьях', author=user)
+        pear = Post.objects.create(text='Груши тоже растут', author=user)
+        Comment.objects.create(post=pear, author=user, text='А ещё сливы')
+
+        assert self.found(client, 'яблоки') == [apple.pk], \
+            'Проверьте, что поиск находит посты по тексту'
+        assert self.found(client, 'сливы') == [pear.pk], \
+            'Проверьте, что поиск находит посты по тексту комментариев'
+        assert set(self.found(client, 'растут')) == {apple.pk, pear.pk}
+        assert self.found(client, '"(*') == []
+
+        apple.text = 'Апельсины'
+        apple.save()
+        assert self.found(client, 'яблоки') == []
+        pear.delete()
+        assert self.found(client, 'сливы') == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_search_pagination(self, client, user):
+        for i in range(15):
+            Post.objects.create(text=f'Пост про котов {i}', author=user)
+        response = client.get('/search/', {'q': 'котов', 'page': 2})
+        assert len(response.context['page']) == 5, \
+            'Проверьте, что результаты поиска разбиты на страницы'
+        assert 'q=%D0%BA%D0%BE%D1%82%D0%BE%D0%B2&page=1' in response.content.decode(), \
+            'Проверьте, что ссылки на страницы сохраняют поисковый запрос'
+        response = client.get('/search/', {'q': 'котов'})
+        assert 'q=%D0%BA%D0%BE%D1%82%D0%BE%D0%B2&page=2">Следующая' in response.content.decode(), \
+            'Проверьте, что ссылка на следующую страницу сохраняет поисковый запрос'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_admin_search(self, admin_client, user):
+        post = Post.objects.create(text='Собаки', author=user)
+        Post.objects.create(text='Кошки', author=user)
+        comment = Comment.objects.create(post=post, author=user, text='Собаки лают')
+        response = admin_client.get('/admin/posts/post/', {'q': 'собаки'})
+        assert [row.pk for row in response.context['cl'].result_list] == [post.pk]
+        response = admin_client.get('/admin/posts/comment/', {'q': 'лают'})
+        assert [row.pk for row in response.context['cl'].result_list] == [comment.pk]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rebuild_command(self, client, user):
+        post = Post.objects.create(text='Перестроенный индекс', author=user)
+        Post.objects.bulk_create([Post(text='Массовая загрузка', author=user)])
+        call_command('rebuild_search_index')
+        assert self.found(client, 'индекс') == [post.pk]
+        assert len(self.found(client, 'загрузка')) == 1
@@ -0,0 +1,77 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from posts import slowlog
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    settings.SLOW_QUERY_MS = 0
+    settings.SLOW_QUERY_LOG = str(tmp_path / 'slow.ndjson')
+    return settings
+
+
+class TestSlowQueryLog:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_entries(self, client, post, slow_log):
+        client.get(f'/{post.author.username}/{post.id}/')
+        entries = list(slowlog.read())
+        assert entries, 'Проверьте, что запросы дольше SLOW_QUERY_MS пишутся в журнал'
+        assert all(entry['view'] == 'post' for entry in entries), \
+            'Проверьте, что у запроса записано имя представления'
+        assert any(entry['template'] and '.html:' in entry['template']
+                   for entry in entries), \
+            'Проверьте, что у запроса из шаблона записана строка шаблона'
+        assert all(entry['code'] and entry['code'].startswith('posts')
+                   for entry in entries), \
+            'Проверьте, что у запроса записана строка кода проекта'
+        selects = [entry for entry in entries
+                   if entry['sql'].startswith('SELECT')]
+        assert selects and all(entry['plan'] for entry in selects), \
+            'Проверьте, что у SELECT записан план EXPLAIN QUERY PLAN'
+        assert any(post.id in entry['params'] and '%s' not in entry['shape']
+                   for entry in selects), \
+            'Проверьте, что запрос записан с параметрами и нормализованной формой'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_threshold(self, client, post, slow_log):
+        slow_log.SLOW_QUERY_MS = None
+        client.get('/')
+        slow_log.SLOW_QUERY_MS = 60 * 1000
+        client.get('/')
+        assert list(slowlog.read()) == [], \
+            'Проверьте, что быстрые запросы в журнал не пишутся'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rotation(self, client, post, slow_log, tmp_path):
+        slow_log.SLOW_QUERY_LOG_MAX_BYTES = 2000
+        slow_log.SLOW_QUERY_LOG_BACKUPS = 2
+        for _ in range(5):
+            client.get(f'/{post.author.username}/')
+        files = sorted(path.name for path in tmp_path.iterdir())
+        assert files == ['slow.ndjson', 'slow.ndjson.1', 'slow.ndjson.2'], \
+            'Проверьте, что журнал ротируется по SLOW_QUERY_LOG_MAX_BYTES'
+        assert list(slowlog.read())
+
+    @pytest.mark.django_db(transaction=True)
+    def test_report(self, client, post, slow_log, tmp_path):
+        client.get('/')
+        client.get(f'/{post.author.username}/{post.id}/')
+        output = tmp_path / 'summary.json'
+        stdout = StringIO()
+        call_command('slow_query_report', output=str(output), stdout=stdout)
+        report = stdout.getvalue()
+        summary = json.loads(output.read_text())
+        assert report.startswith(f'Queries: {len(list(slowlog.read()))},')
+        totals = [shape['total_ms'] for shape in summary]
+        assert totals == sorted(totals, reverse=True), \
+            'Проверьте, что формы запросов упорядочены по суммарному времени'
+        assert f'1. {summary[0]["total_ms"]:.1f} ms total' in report
+
+        stdout = StringIO()
+        call_command('slow_query_report', views=['index'], stdout=stdout)
+        assert 'post (' not in stdout.getvalue()
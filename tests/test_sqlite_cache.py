@@ -0,0 +1,111 @@
+import json
+import multiprocessing
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from posts.sqlite_cache import SQLiteCache
+
+
+def make_cache(path, **options):
+    return SQLiteCache(str(path / 'cache.sqlite3'), {'OPTIONS': options})
+
+
+def _count(path):
+    cache = make_cache(path)
+    for _ in range(50):
+        cache.incr('counter')
+
+
+class TestSQLiteCache:
+
+    def test_values(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.set('number', 5)
+        cache.set('data', {'html': '<p>пост</p>', 'ids': [1, 2]})
+        cache.set('none', None)
+        assert cache.get('number') == 5
+        assert cache.get('data') == {'html': '<p>пост</p>', 'ids': [1, 2]}
+        assert cache.get('none', 'default') is None, \
+            'Проверьте, что None хранится как значение, а не как промах'
+        assert cache.get('missing', 'default') == 'default'
+        assert cache.has_key('data') and not cache.has_key('missing')
+
+        cache.set_many({'a': 1, 'b': 'два'})
+        assert cache.get_many(['a', 'b', 'c']) == {'a': 1, 'b': 'два'}
+        cache.delete_many(['a', 'b'])
+        assert cache.get_many(['a', 'b']) == {}
+        assert cache.delete('number') and not cache.delete('number')
+        cache.clear()
+        assert cache.get('data') is None
+
+    def test_add_and_incr(self, tmp_path):
+        cache = make_cache(tmp_path)
+        assert cache.add('key', 1)
+        assert not cache.add('key', 2), \
+            'Проверьте, что add не перезаписывает существующий ключ'
+        assert cache.incr('key') == 2
+        assert cache.incr('key', 10) == 12
+        assert cache.decr('key', 2) == 10
+        with pytest.raises(ValueError):
+            cache.incr('missing')
+
+    def test_expiry(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.set('short', 1, timeout=0.2)
+        cache.set('long', 1, timeout=60)
+        cache.set('forever', 1, timeout=None)
+        assert cache.touch('long', timeout=0.2)
+        time.sleep(0.3)
+        assert cache.get_many(['short', 'long', 'forever']) == {'forever': 1}, \
+            'Проверьте, что просроченные записи не возвращаются'
+        assert not cache.touch('short')
+        assert cache.add('short', 2), \
+            'Проверьте, что add занимает просроченный ключ'
+        assert cache.get('short') == 2
+
+    def test_cull_least_recently_used(self, tmp_path):
+        cache = make_cache(tmp_path, MAX_ENTRIES=10, CULL_FREQUENCY=2,
+                           CULL_CHECK_INTERVAL=1, ACCESS_RESOLUTION=0)
+        for number in range(10):
+            cache.set(f'key{number}', number)
+            time.sleep(0.002)
+        cache.get('key0')
+        cache.set('key10', 10)
+        kept = cache.get_many([f'key{number}' for number in range(11)])
+        assert len(kept) <= 10, 'Проверьте, что кеш не растёт выше MAX_ENTRIES'
+        assert 'key0' in kept and 'key10' in kept, \
+            'Проверьте, что вытесняются давно не читанные записи'
+        assert 'key1' not in kept
+
+    def test_shared_between_processes(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.set('counter', 0)
+        cache.get('counter')
+        processes = [multiprocessing.Process(target=_count, args=(tmp_path,))
+                     for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        assert cache.get('counter') == 200, \
+            'Проверьте, что incr атомарен между процессами'
+
+
+def test_benchmark_cache(tmp_path):
+    output = tmp_path / 'result.json'
+    stdout = StringIO()
+    call_command('benchmark_cache', count=20, output=str(output),
+                 stdout=stdout)
+    result = json.loads(output.read_text())
+    assert set(result['ops_per_second']) == {'locmem', 'filebased', 'sqlite'}
+    assert all(value > 0 for value in result['ops_per_second']['sqlite'].values())
+    assert 'sqlite' in stdout.getvalue()
+
+
+def test_tests_use_their_own_cache(settings):
+    location = settings.CACHES['default']['LOCATION']
+    assert not location.startswith(settings.BASE_DIR), \
+        'Проверьте, что тесты не очищают кеш проекта'
@@ -0,0 +1,58 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.base import File
+from PIL import Image
+from sorl.thumbnail import default
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class TestThumbnails:
+
+    @staticmethod
+    def get_image_file(name):
+        file_obj = BytesIO()
+        Image.new('RGB', size=(1200, 800), color=(255, 0, 0)).save(file_obj, 'png')
+        file_obj.seek(0)
+        return File(file_obj, name=name)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_thumbnail_generated_off_request(self, settings, user_client, user, group):
+        settings.THUMBNAIL_WORKERS = 1
+        response = user_client.post('/new/', {
+            'text': 'Пост с картинкой', 'group': group.id,
+            'image': self.get_image_file('thumbnail.png'),
+        })
+        assert response.status_code == 302
+        thumbnails.wait()
+
+        post = user.posts.get()
+        thumbnail = default.backend.get_ready_thumbnail(
+            post.image, '960x339', crop='center', upscale=True
+        )
+        assert thumbnail is not None, \
+            'Проверьте, что миниатюра создаётся после сохранения поста'
+        response = user_client.get('/')
+        assert thumbnail.url in response.content.decode(), \
+            'Проверьте, что на главной странице выводится готовая миниатюра'
+        default.backend.delete(post.image)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_missing_thumbnail_not_rendered_in_request(self, settings, client, post):
+        settings.THUMBNAIL_WORKERS = 1
+        response = client.get('/')
+        assert post.image.url in response.content.decode(), \
+            'Проверьте, что пока миниатюры нет, выводится исходное изображение'
+        thumbnails.wait()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_pending_thumbnail_sized(self, settings, client, user):
+        settings.THUMBNAIL_WORKERS = 1
+        Post.objects.create(text='Пост', author=user, image='posts/pending.png',
+                            image_width=1200, image_height=800)
+        response = client.get('/')
+        assert 'width="1200" height="800"' in response.content.decode(), \
+            'Проверьте, что у исходного изображения выводятся его размеры, пока нет миниатюры'
+        thumbnails.wait()
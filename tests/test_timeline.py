@@ -0,0 +1,73 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Follow, Post, TimelineEntry
+from posts.timeline import PROLIFIC_AUTHORS_KEY, feed
+
+
+class TestTimeline:
+
+    @pytest.fixture
+    def author(self):
+        return get_user_model().objects.create_user(username='TimelineAuthor')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_fan_out_and_prune(self, user_client, user, author):
+        Post.objects.create(text='Старый пост', author=author)
+        user_client.get(f'/{author.username}/follow/')
+        assert TimelineEntry.objects.filter(user=user).count() == 1, \
+            'Проверьте, что при подписке лента заполняется постами автора'
+
+        Post.objects.create(text='Новый пост', author=author)
+        assert TimelineEntry.objects.filter(user=user).count() == 2, \
+            'Проверьте, что новый пост попадает в ленты подписчиков'
+        response = user_client.get('/follow/')
+        assert len(response.context['page']) == 2
+
+        user_client.get(f'/{author.username}/unfollow/')
+        assert not TimelineEntry.objects.filter(user=user).exists(), \
+            'Проверьте, что при отписке посты автора убираются из ленты'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_trim(self, settings, user, author):
+        settings.TIMELINE_LENGTH = 3
+        for i in range(5):
+            Post.objects.create(text=f'Пост {i}', author=author)
+        Follow.objects.create(user=user, author=author)
+        assert TimelineEntry.objects.filter(user=user).count() == 3, \
+            'Проверьте, что длина ленты ограничена `TIMELINE_LENGTH`'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_fan_out_trims_in_one_query(self, settings, user, author, django_user_model):
+        settings.TIMELINE_LENGTH = 2
+        settings.TIMELINE_TRIM_INTERVAL = 1
+        readers = [django_user_model.objects.create_user(username=f'Reader{i}')
+                   for i in range(5)]
+        for reader in readers + [user]:
+            Follow.objects.create(user=reader, author=author)
+        for i in range(3):
+            Post.objects.create(text=f'Пост {i}', author=author)
+        with CaptureQueriesContext(connection) as queries:
+            Post.objects.create(text='Ещё пост', author=author)
+        deletes = [q['sql'] for q in queries
+                   if q['sql'].startswith('DELETE') and 'posts_timelineentry' in q['sql']]
+        assert len(deletes) == 1, \
+            'Проверьте, что ленты всех подписчиков обрезаются одним запросом'
+        for reader in readers + [user]:
+            assert TimelineEntry.objects.filter(user=reader).count() == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_prolific_author_is_pulled(self, settings, user, author):
+        settings.TIMELINE_FANOUT_LIMIT = 0
+        cache.delete(PROLIFIC_AUTHORS_KEY)
+        Follow.objects.create(user=user, author=author)
+        cache.delete(PROLIFIC_AUTHORS_KEY)
+        post = Post.objects.create(text='Пост популярного автора', author=author)
+        assert not TimelineEntry.objects.exists(), \
+            'Проверьте, что посты популярных авторов не копируются в ленты'
+        assert list(feed(user)) == [post], \
+            'Проверьте, что посты популярных авторов попадают в ленту при чтении'
+        cache.delete(PROLIFIC_AUTHORS_KEY)
@@ -0,0 +1,96 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from posts import trending
+from posts.models import Comment, Follow, Post, TrendingScore
+
+
+@pytest.fixture
+def posts(user, django_user_model):
+    reader = django_user_model.objects.create_user(username='Reader')
+    return [Post.objects.create(text=f'Пост {i}', author=user)
+            for i in range(12)], reader
+
+
+def scores():
+    return dict(TrendingScore.objects.values_list('post_id', 'score'))
+
+
+class TestTrending:
+
+    def test_decay(self, settings):
+        settings.TRENDING_HALF_LIFE = 3600
+        moment = timezone.now()
+        score = trending.event(4, moment)
+        assert trending.decayed(score, moment) == pytest.approx(4)
+        assert trending.decayed(score, moment + datetime.timedelta(hours=2)) == \
+            pytest.approx(1), 'Проверьте, что счёт убывает вдвое за TRENDING_HALF_LIFE'
+        later = trending._logaddexp(score, trending.event(1, moment))
+        assert trending.decayed(later, moment) == pytest.approx(5)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_incremental(self, user, posts):
+        posts, reader = posts
+        before = scores()
+        assert set(before) == {post.pk for post in posts}, \
+            'Проверьте, что новая запись получает счёт при публикации'
+        for _ in range(2):
+            Comment.objects.create(post=posts[0], author=reader, text='Коммент')
+        after = scores()
+        assert after[posts[0].pk] > after[posts[-1].pk], \
+            'Проверьте, что комментарии поднимают счёт записи'
+        assert {pk: score for pk, score in after.items() if pk != posts[0].pk} == \
+            {pk: score for pk, score in before.items() if pk != posts[0].pk}
+
+        trending.rebuild()
+        assert scores() == pytest.approx(after), \
+            'Проверьте, что пересчёт совпадает с пошаговым обновлением'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_followers(self, user, posts):
+        posts, reader = posts
+        Follow.objects.create(user=reader, author=user)
+        post = Post.objects.create(text='Пост читателя', author=reader)
+        followed = Post.objects.create(text='Пост автора', author=user)
+        assert scores()[followed.pk] > scores()[post.pk], \
+            'Проверьте, что записи автора с подписчиками выше в списке'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_page(self, client, posts):
+        posts, reader = posts
+        Comment.objects.create(post=posts[3], author=reader, text='Коммент')
+        response = client.get('/trending/')
+        assert response.status_code == 200
+        page = response.context['page']
+        first = [post.pk for post in page]
+        assert first[0] == posts[3].pk, \
+            'Проверьте, что на /trending/ записи упорядочены по счёту'
+        response = client.get(f'/trending/?after={page.next_cursor}')
+        rest = [post.pk for post in response.context['page']]
+        assert sorted(first + rest) == sorted(post.pk for post in posts), \
+            'Проверьте, что /trending/ листается по курсору без повторов'
+        assert first[1:] + rest == sorted(first[1:] + rest, reverse=True)
+
+        etag = client.get('/trending/')['ETag']
+        Comment.objects.create(post=posts[5], author=reader, text='Коммент')
+        assert client.get('/trending/', HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_refresh(self, settings, posts):
+        posts, reader = posts
+        Post.objects.filter(pk=posts[0].pk).update(
+            pub_date=timezone.now() - datetime.timedelta(
+                seconds=settings.TRENDING_WINDOW + 60)
+        )
+        TrendingScore.objects.filter(post=posts[1]).delete()
+        stdout = StringIO()
+        call_command('refresh_trending', stdout=stdout)
+        assert stdout.getvalue().startswith('11 trending posts')
+        assert set(scores()) == {post.pk for post in posts[1:]}, \
+            'Проверьте, что refresh_trending убирает старые записи и пересчитывает остальные'
+        Comment.objects.create(post=posts[0], author=reader, text='Коммент')
+        assert posts[0].pk not in scores()
@@ -0,0 +1,37 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Requests are routed with ``yatube/asgi_urls.py``, which serves the async
+versions of the hot read views from ``posts/async_views.py``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
+"""
+
+import os
+
+import django
+from asgiref.sync import ThreadSensitiveContext
+from django.core.handlers.asgi import ASGIHandler
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+
+class YatubeASGIHandler(ASGIHandler):
+
+    async def __call__(self, scope, receive, send):
+        # Sync middleware and ORM calls of a request get a thread of their
+        # own; outside such a context every request shares a single thread.
+        async with ThreadSensitiveContext():
+            await super().__call__(scope, receive, send)
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = 'yatube.asgi_urls'
+        return request, error_response
+
+
+django.setup(set_prefix=False)
+application = YatubeASGIHandler()
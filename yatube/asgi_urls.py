@@ -0,0 +1,15 @@
+"""``yatube/urls.py`` with the async posts views, for ``yatube/asgi.py``."""
+from django.urls import include, path
+
+import posts.urls
+
+from . import urls
+
+handler404 = urls.handler404
+handler500 = urls.handler500
+
+urlpatterns = [
+    path('', include('posts.async_urls'))
+    if getattr(pattern, 'urlconf_name', None) is posts.urls else pattern
+    for pattern in urls.urlpatterns
+]
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -45,12 +46,16 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'sorl.thumbnail',
-    "debug_toolbar",
 ]
 
 SITE_ID = 1
 
 MIDDLEWARE = [
+    'posts.middleware.ProfilingMiddleware',
+    'posts.middleware.MetricsMiddleware',
+    'posts.middleware.SlowQueryMiddleware',
+    'posts.middleware.QueryBudgetMiddleware',
+    'posts.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,15 +63,24 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    "debug_toolbar.middleware.DebugToolbarMiddleware"
 ]
 
+# The debug toolbar keeps the data of every request in memory, so it is for
+# development only: off without DEBUG or with DEBUG_TOOLBAR=0 in the
+# environment.
+
+DEBUG_TOOLBAR = DEBUG and os.environ.get('DEBUG_TOOLBAR', '1') != '0'
+
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'posts.metrics.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -90,9 +104,21 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    },
+    # Reads of the page views, see posts/routers.py. Locally a copy of
+    # db.sqlite3 made by ``manage.py sync_replica``.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db-replica.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+DATABASE_ROUTERS = ['posts.routers.PrimaryReplicaRouter']
+
+# Seconds the reads of a user stay on the primary after they wrote
+REPLICA_PIN_SECONDS = 10
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -144,12 +170,87 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
+# One cache for all worker processes of the project, see
+# posts/sqlite_cache.py. The tests use their own, see tests/fixtures.
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'posts.sqlite_cache.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'default.sqlite3'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
     }
 }
 
+# ``manage.py test`` runs on a throwaway cache, see yatube/test_runner.py
+TEST_RUNNER = 'yatube.test_runner.TestRunner'
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
+
+# Follow feed timelines
+
+TIMELINE_LENGTH = 500
+TIMELINE_FANOUT_LIMIT = 5000
+TIMELINE_TRIM_INTERVAL = 50
+
+# Trending posts, see posts/trending.py. Seconds.
+
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_WINDOW = 7 * 24 * 60 * 60
+
+# Query budgets, see posts/budgets.py
+
+QUERY_BUDGET_STRICT = False
+QUERY_REPEAT_LIMIT = 3
+
+# Rendered post cards, see posts/templatetags/post_cards.py
+
+POST_CARD_TIMEOUT = 60 * 60 * 24
+
+# Thumbnails, see posts/thumbnails.py. With THUMBNAIL_WORKERS = 0 they are
+# rendered inline, as sorl-thumbnail does by default.
+
+THUMBNAIL_BACKEND = 'posts.thumbnails.DeferredThumbnailBackend'
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_QUEUE_SIZE = 100
+THUMBNAIL_PREGENERATE = [
+    ('960x339', {'crop': 'center', 'upscale': True}),
+]
+
+# Uploaded images are shrunk to this size on the longer side
+
+IMAGE_MAX_SIZE = 2048
+
+# Comments per page of post_view and its fragment endpoint
+
+COMMENTS_PER_PAGE = 20
+
+# JSON API pages: default and largest ?limit=, also the most ids of a batch
+
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Sampled cProfile dumps, see posts/profiling.py. Requests with a signed
+# X-Profile header (manage.py profile_token) are always profiled.
+
+PROFILE_SAMPLE_RATE = 0.0
+PROFILE_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILE_TOKEN_MAX_AGE = 60 * 60
+
+# Prometheus metrics, see posts/metrics.py. Every process writes a file of
+# its own in METRICS_DIR, /metrics sums them for scrapers that send
+# "Authorization: Bearer <METRICS_TOKEN>". Without a token it is off.
+
+METRICS_DIR = os.path.join(tempfile.gettempdir(), 'yatube-metrics')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Queries slower than SLOW_QUERY_MS milliseconds are logged as NDJSON with
+# their plan and origin, see posts/slowlog.py. None turns the log off.
+
+SLOW_QUERY_MS = 100
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'logs', 'slow-queries.ndjson')
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 5
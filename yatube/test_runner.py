@@ -0,0 +1,21 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """Run ``manage.py test`` on a cache of its own, removed afterwards."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp(prefix='yatube-test-cache-')
+        settings.CACHES['default']['LOCATION'] = os.path.join(
+            self.cache_dir, 'default.sqlite3'
+        )
+
+    def teardown_test_environment(self, **kwargs):
+        super().teardown_test_environment(**kwargs)
+        shutil.rmtree(self.cache_dir, ignore_errors=True)